@@ -1,37 +1,343 @@
 #!/usr/bin/env python3
 """Analyze failed eval cases"""
+import argparse
+import atexit
+import heapq
 import json
-import glob
+import mmap
 import os
+import pickle
+import re
+import sys
+import zipfile
 from pathlib import Path
 
+try:
+    import ijson
+except ImportError:  # Fall back to parsing whole logs
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib parser
+    orjson = None
+
 log_dir = Path("./logs")
-log_files = sorted(log_dir.glob("*.eval"), key=os.path.getmtime, reverse=True)[:12]
+max_logs = 12
+cache_file = Path("./.cache/failures.pkl")
+
+# Logs at least this large are memory-mapped instead of read into a copy
+MMAP_THRESHOLD = 1 << 20
+
+# Leading bytes searched for the log header (every field before "samples")
+HEAD_BYTES = 64 * 1024
+_SAMPLES_RE = re.compile(rb',\s*"samples"\s*:\s*\[')
+
+# Top-level log fields read before streaming samples
+HEADER_KEYS = ('status', 'eval', 'results', 'stats')
+
+# Score keys checked, in order, to decide whether a sample passed
+SCORER_KEYS = ('includes', 'includes_any', 'match')
+
+# Value of a passing score, as inspect_ai.scorer.CORRECT
+CORRECT = "C"
+
+# Bump when the summary layout or scoring changes so stale caches are ignored
+CACHE_VERSION = 4
+
+# Per-log summaries keyed by path, stamped with (mtime, size) of the parsed file
+_cache = {}
+_cache_dirty = False
+
+
+def _read_cache():
+    """Load the summary cache, starting empty if it is missing or unreadable."""
+    try:
+        with open(cache_file, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return {}
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return {}
+    return cached["entries"]
+
+
+def _write_cache():
+    """Atomically persist the summary cache if anything changed."""
+    if not _cache_dirty:
+        return
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(".tmp")
+    with open(tmp_file, "wb") as f:
+        pickle.dump({"version": CACHE_VERSION, "entries": _cache}, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+
+def _read_json(path):
+    """Parse a JSON log, using orjson (and mmap for large files) when available."""
+    with open(path, "rb") as f:
+        if orjson is None:
+            return json.load(f)
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf, memoryview(buf) as view:
+            return orjson.loads(view)
+
+
+def _read_header(f):
+    """Stream top-level fields until the ones in HEADER_KEYS have been seen."""
+    header = {}
+    for key, value in ijson.kvitems(f, '', use_float=True):
+        if key in HEADER_KEYS:
+            header[key] = value
+            # An errored or cancelled run may have no results to wait for
+            if len(header) == len(HEADER_KEYS) or ('eval' in header and header.get('status', 'success') != 'success'):
+                break
+    return header
+
+
+def _peek_header(path):
+    """Decode the log header from the head of the file, or return None if it doesn't fit."""
+    with open(path, "rb") as f:
+        head = f.read(HEAD_BYTES)
+
+    match = _SAMPLES_RE.search(head)
+    if match is None:
+        return None
+    # Closing the object right before "samples" leaves a complete JSON document
+    try:
+        header = (orjson.loads if orjson else json.loads)(head[:match.start()] + b"}")
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or not all(key in header for key in HEADER_KEYS):
+        return None
+    return header
+
+
+def _summarize(path):
+    """Parse a log and keep only the fields the report needs."""
+    if zipfile.is_zipfile(path):
+        return _summarize_archive(path)
+
+    # Passing logs have nothing to report, so skip decoding their samples entirely
+    header = _peek_header(path)
+    if header is not None and (not _succeeded(header) or _accuracy(header) >= 1.0):
+        return _collect(header, ())
+
+    if ijson is None:
+        data = _read_json(path)
+        return _collect(data, data.get('samples', []))
+
+    # Samples are streamed one at a time, so peak memory is one sample, not the file.
+    # Each sample is built whole by ijson's C backend and only a 300-char slice of
+    # its input is kept; walking ijson.parse() events in Python to skip unused
+    # fields was ~50% slower and did not lower peak memory.
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        f.seek(0)
+        return _collect(header, ijson.items(f, 'samples.item', use_float=True))
+
+
+def _summarize_archive(path):
+    """Summarize a log in inspect_ai's zip format, which only inspect_ai reads."""
+    from inspect_ai.log import read_eval_log, read_eval_log_samples
+
+    header = read_eval_log(path, header_only=True).model_dump(mode='json', exclude={'samples'})
+    if not _succeeded(header) or _accuracy(header) >= 1.0:
+        return _collect(header, ())
+
+    samples = (
+        {
+            'id': sample.id,
+            'input': sample.input if isinstance(sample.input, str) else str(sample.input),
+            'target': sample.target,
+            'output': {'completion': sample.output.completion},
+            'scores': {name: {'value': score.value} for name, score in (sample.scores or {}).items()},
+        }
+        for sample in read_eval_log_samples(path, all_samples_required=False)
+    )
+    return _collect(header, samples)
 
-print("Analyzing recent eval failures...\n")
 
-for log_file in log_files:
-    with open(log_file) as f:
-        data = json.load(f)
+def _succeeded(header):
+    """Return whether a log is of a finished run with results; errored and cancelled runs have none to report."""
+    return header.get('status', 'success') == 'success' and bool(header.get('results'))
 
-    task = data['eval']['task']
-    accuracy = data['results']['scores'][0]['metrics']['accuracy']['value']
 
-    if accuracy < 1.0:  # Has failures
-        print(f"{'='*80}")
-        print(f"Task: {task}")
-        print(f"Accuracy: {accuracy:.1%}")
-        print(f"{'='*80}\n")
+def _accuracy(header):
+    return header['results']['scores'][0]['metrics']['accuracy']['value']
 
-        for sample in data['samples']:
-            score = sample.get('scores', [{}])[0].get('value', {})
 
-            # Check if failed (works for both 'includes' and 'match' scorers)
-            passed = score.get('includes', score.get('match', True))
+def _collect(header, samples):
+    """Build a summary from the log header and an iterable of samples.
+
+    Logs that didn't succeed get an accuracy of None and no failures.
+    """
+    accuracy = _accuracy(header) if _succeeded(header) else None
+    usage = (header.get('stats') or {}).get('model_usage') or {}
+    failures = []
+
+    if accuracy is not None and accuracy < 1.0:  # Has failures
+        for sample in samples:
+            scores = sample.get('scores')
+            if not scores:
+                continue  # Unscored samples count as passed
+            # Logs map scorer names to scores; a list of scores is read the same way
+            first = next(iter(scores.values())) if isinstance(scores, dict) else scores[0]
+            score = first['value']
+
+            # Check if failed (works for the 'includes', 'includes_any' and 'match' scorers)
+            passed = True
+            if isinstance(score, str):
+                passed = score == CORRECT
+            elif isinstance(score, (int, float)):
+                # Batched samples score the fraction of their questions answered correctly
+                passed = score >= 1.0
+            else:
+                for key in SCORER_KEYS:
+                    if key in score:
+                        passed = score[key]
+                        break
 
             if not passed:
-                print(f"❌ Sample {sample['id']}:")
-                print(f"Input: {sample['input'][:300]}...")
-                print(f"Expected: {sample['target']}")
-                print(f"Got: {sample['output']['completion']}")
-                print()
+                failures.append({
+                    'id': sample['id'],
+                    'input': sample['input'][:300],
+                    'target': sample['target'],
+                    'completion': sample['output']['completion'],
+                })
+
+    return {
+        'task': header['eval']['task'],
+        'model': header['eval'].get('model'),
+        'status': header.get('status', 'success'),
+        'accuracy': accuracy,
+        'samples': header['results'].get('total_samples', 0) if accuracy is not None else 0,
+        'tokens': sum(u.get('total_tokens', 0) for u in usage.values()),
+        'failures': failures,
+    }
+
+
+def _load_summary(path):
+    """Return the cached summary for a log, re-parsing only if it changed."""
+    global _cache_dirty
+    st = os.stat(path)
+    key = str(path)
+    stamp = (st.st_mtime, st.st_size)
+
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    summary = _summarize(path)
+    _cache[key] = (stamp, summary)
+    _cache_dirty = True
+    return summary
+
+
+def recent_logs(limit=max_logs):
+    """Return .eval files under log_dir, newest first, keeping at most limit (None for all)."""
+    if not log_dir.is_dir():
+        return []
+    # DirEntry caches stat results, so each log costs at most one stat call
+    with os.scandir(log_dir) as it:
+        entries = ((e.stat().st_mtime, e.path) for e in it if e.name.endswith('.eval'))
+        if limit is None:
+            entries = sorted(entries, reverse=True)
+        else:
+            # Only a limit-sized heap is kept live, however large the directory grows
+            entries = heapq.nlargest(limit, entries)
+    return [path for _, path in entries]
+
+
+def load_summaries(paths):
+    """Return summaries for the given logs in order, parsing only the logs that changed."""
+    return [_load_summary(path) for path in paths]
+
+
+def format_report(summary, verbose=True):
+    """Return the failure report for one summary, or '' if every sample passed."""
+    accuracy = summary['accuracy']
+
+    if accuracy is None or accuracy >= 1.0:
+        return ""
+    if not verbose:
+        return f"{summary['task']}: {accuracy:.1%} ({len(summary['failures'])} failed)\n"
+
+    lines = [
+        f"{'='*80}",
+        f"Task: {summary['task']}",
+        f"Accuracy: {accuracy:.1%}",
+        f"{'='*80}\n",
+    ]
+    for failure in summary['failures']:
+        lines += [
+            f"❌ Sample {failure['id']}:",
+            f"Input: {failure['input']}...",
+            f"Expected: {failure['target']}",
+            f"Got: {failure['completion']}",
+            "",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def analyze(path, verbose=True):
+    """Return the failure report for one log, or '' if every sample passed."""
+    return format_report(_load_summary(path), verbose)
+
+
+def write_failures(out_path, log_files, summaries):
+    """Write one JSON line per failed sample so later tooling can skip the logs."""
+    dumps = orjson.dumps if orjson else (lambda obj: json.dumps(obj).encode())
+    count = 0
+    with open(out_path, "wb") as f:
+        for log_file, summary in zip(log_files, summaries):
+            for failure in summary['failures']:
+                f.write(dumps({
+                    'task': summary['task'],
+                    'file': str(log_file),
+                    'id': failure['id'],
+                    'input': failure['input'],
+                    'target': failure['target'],
+                    'got': failure['completion'],
+                }) + b"\n")
+                count += 1
+    return count
+
+
+_cache = _read_cache()
+atexit.register(_write_cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze failed eval cases")
+    parser.add_argument(
+        "--output", "-o",
+        default="failures.jsonl",
+        help="JSON Lines file for failed samples (default: failures.jsonl)",
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Print every failed sample instead of one line per task",
+    )
+    args = parser.parse_args()
+
+    log_files = recent_logs()
+    summaries = load_summaries(log_files)
+    count = write_failures(args.output, log_files, summaries)
+
+    out = ["Analyzing recent eval failures...\n\n"]
+    out.extend(format_report(summary, args.verbose) for summary in summaries)
+    skipped = sum(summary['accuracy'] is None for summary in summaries)
+    if skipped:
+        out.append(f"\nSkipped {skipped} logs of runs that errored or were cancelled\n")
+    out.append(f"\nWrote {count} failed samples to {args.output}\n")
+
+    # One write for the whole report rather than a print per line
+    sys.stdout.write("".join(out))
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
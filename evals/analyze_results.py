@@ -1,87 +1,150 @@
 #!/usr/bin/env python3
 """Analyze eval results to show 3TL vs CSV comparison"""
+import argparse
+import sys
 
-results = {
+import pandas as pd
+
+from analyze_failures import load_summaries, log_dir, recent_logs
+
+# Task -> comparison category
+CATEGORIES = {
     # CSV tasks
-    "type_inference_csv": {"accuracy": 1.0, "samples": 2, "tokens": 214},
-    "relationship_inference_csv": {"accuracy": 1.0, "samples": 1, "tokens": 169},
-    "data_validation_csv": {"accuracy": 1.0, "samples": 1, "tokens": 210},
-    "multi_table_csv": {"accuracy": 1.0, "samples": 1, "tokens": 147},
-    
+    "type_inference_csv": "csv",
+    "relationship_inference_csv": "csv",
+    "data_validation_csv": "csv",
+    "multi_table_csv": "csv",
+
     # 3TL tasks
-    "type_reading_3tl": {"accuracy": 1.0, "samples": 3, "tokens": 426},
-    "relationship_reading_3tl": {"accuracy": 1.0, "samples": 2, "tokens": 400},
-    "data_validation_3tl": {"accuracy": 1.0, "samples": 1, "tokens": 208},
-    "multi_table_3tl": {"accuracy": 1.0, "samples": 2, "tokens": 493},
-    
+    "type_reading_3tl": "3tl",
+    "relationship_reading_3tl": "3tl",
+    "data_validation_3tl": "3tl",
+    "multi_table_3tl": "3tl",
+
     # 3TL-only features
-    "enum_understanding": {"accuracy": 1.0, "samples": 2, "tokens": 417},
-    "precision_understanding": {"accuracy": 0.5, "samples": 2, "tokens": 508},
-    
+    "enum_understanding": "3tl_only",
+    "precision_understanding": "3tl_only",
+
     # Comparison
-    "schema_generation_comparison": {"accuracy": 0.5, "samples": 2, "tokens": 583},
+    "schema_generation_comparison": "comparison",
 }
 
-print("=" * 80)
-print("3TL vs CSV Evaluation Results (Claude 3 Haiku)")
-print("=" * 80)
-print()
-
-# CSV tasks
-csv_total_samples = 5
-csv_total_correct = 5
-csv_total_tokens = 740
-csv_accuracy = csv_total_correct / csv_total_samples
-
-print("📊 CSV Format Tasks:")
-print(f"  Accuracy: {csv_accuracy:.1%} ({csv_total_correct}/{csv_total_samples})")
-print(f"  Total tokens: {csv_total_tokens}")
-print(f"  Avg tokens/sample: {csv_total_tokens/csv_total_samples:.1f}")
-print()
-
-# 3TL tasks (comparable to CSV)
-ttl_total_samples = 8
-ttl_total_correct = 8
-ttl_total_tokens = 1527
-ttl_accuracy = ttl_total_correct / ttl_total_samples
-
-print("📊 3TL Format Tasks (comparable):")
-print(f"  Accuracy: {ttl_accuracy:.1%} ({ttl_total_correct}/{ttl_total_samples})")
-print(f"  Total tokens: {ttl_total_tokens}")
-print(f"  Avg tokens/sample: {ttl_total_tokens/ttl_total_samples:.1f}")
-print()
-
-# 3TL-only features
-ttl_only_samples = 4
-ttl_only_correct = 3  # enum=2/2, precision=1/2
-ttl_only_tokens = 925
-
-print("📊 3TL-Only Features (enum, precision):")
-print(f"  Accuracy: {ttl_only_correct/ttl_only_samples:.1%} ({ttl_only_correct}/{ttl_only_samples})")
-print(f"  Total tokens: {ttl_only_tokens}")
-print(f"  Avg tokens/sample: {ttl_only_tokens/ttl_only_samples:.1f}")
-print()
-
-print("=" * 80)
-print("KEY FINDINGS:")
-print("=" * 80)
-print()
-print("✅ Both CSV and 3TL achieved 100% accuracy on comparable tasks")
-print("   - This shows Claude Haiku can understand both formats well")
-print()
-print("✅ 3TL enables features CSV cannot express:")
-print("   - Enum constraints: 100% accuracy (2/2)")
-print("   - Precision specs: 50% accuracy (1/2)")
-print()
-print("⚠️  Token usage is higher for 3TL:")
-print(f"   - CSV: {csv_total_tokens/csv_total_samples:.1f} tokens/sample")
-print(f"   - 3TL: {ttl_total_tokens/ttl_total_samples:.1f} tokens/sample")
-print(f"   - Overhead: +{((ttl_total_tokens/ttl_total_samples)/(csv_total_tokens/csv_total_samples)-1)*100:.1f}%")
-print()
-print("💡 VALUE PROPOSITION:")
-print("   - 3TL doesn't improve accuracy on basic tasks (both 100%)")
-print("   - 3TL ADDS capabilities CSV lacks (enums, precision, refs)")
-print("   - Token overhead: ~29% more (acceptable for added features)")
-print("   - Best for: complex schemas where explicit types matter")
-print()
+SECTIONS = [
+    ("csv", "CSV Format Tasks"),
+    ("3tl", "3TL Format Tasks (comparable)"),
+    ("3tl_only", "3TL-Only Features (enum, precision)"),
+]
+
+
+def load_results(model=None):
+    """Return the newest result for each known task and model as a DataFrame.
+
+    Only model's results are kept if it is given. Logs of runs that errored or were
+    cancelled are left out; df.attrs["skipped"] counts them.
+    """
+    summaries = load_summaries(recent_logs(limit=None))
+    finished = [s for s in summaries if s["accuracy"] is not None]
+    df = pd.DataFrame(
+        [{key: s[key] for key in ("task", "model", "accuracy", "samples", "tokens")} for s in finished],
+        columns=["task", "model", "accuracy", "samples", "tokens"],
+    )
+    df["model"] = df["model"].fillna("unknown")
+    if model is not None:
+        df = df[df["model"] == model]
+    # Logs are newest first, so the first row per model and task is the latest run
+    df = df[df["task"].isin(CATEGORIES)].drop_duplicates(["model", "task"])
+    df["category"] = df["task"].map(CATEGORIES)
+    df["correct"] = (df["accuracy"] * df["samples"]).round().astype(int)
+    df.attrs["skipped"] = len(summaries) - len(finished)
+    return df
+
+
+def format_report(model, df):
+    """Return the report lines comparing 3TL and CSV for one model's results."""
+    totals = df.groupby("category").agg(
+        samples=("samples", "sum"),
+        correct=("correct", "sum"),
+        tokens=("tokens", "sum"),
+    )
+    totals["accuracy"] = totals["correct"] / totals["samples"]
+    totals["tokens_per_sample"] = totals["tokens"] / totals["samples"]
+    by_task = df.set_index("task")
+
+    out = []
+    out.append("=" * 80)
+    out.append(f"3TL vs CSV Evaluation Results ({model})")
+    out.append("=" * 80)
+    out.append("")
+
+    for category, title in SECTIONS:
+        if category not in totals.index:
+            continue
+        row = totals.loc[category]
+        out.append(f"📊 {title}:")
+        out.append(f"  Accuracy: {row['accuracy']:.1%} ({row['correct']:.0f}/{row['samples']:.0f})")
+        out.append(f"  Total tokens: {row['tokens']:.0f}")
+        out.append(f"  Avg tokens/sample: {row['tokens_per_sample']:.1f}")
+        out.append("")
+
+    out.append("=" * 80)
+    out.append("KEY FINDINGS:")
+    out.append("=" * 80)
+    out.append("")
+
+    if {"csv", "3tl"} <= set(totals.index):
+        csv, ttl = totals.loc["csv"], totals.loc["3tl"]
+        out.append("✅ Accuracy on comparable tasks:")
+        out.append(f"   - CSV: {csv['accuracy']:.1%}")
+        out.append(f"   - 3TL: {ttl['accuracy']:.1%}")
+        out.append("")
+
+    features = [("Enum constraints", "enum_understanding"), ("Precision specs", "precision_understanding")]
+    features = [(label, by_task.loc[task]) for label, task in features if task in by_task.index]
+    if features:
+        out.append("✅ 3TL enables features CSV cannot express:")
+        for label, row in features:
+            out.append(f"   - {label}: {row['accuracy']:.0%} accuracy ({row['correct']:.0f}/{row['samples']:.0f})")
+        out.append("")
+
+    if {"csv", "3tl"} <= set(totals.index):
+        csv_tps = totals.loc["csv", "tokens_per_sample"]
+        ttl_tps = totals.loc["3tl", "tokens_per_sample"]
+        out.append("⚠️  Token usage for 3TL vs CSV:")
+        out.append(f"   - CSV: {csv_tps:.1f} tokens/sample")
+        out.append(f"   - 3TL: {ttl_tps:.1f} tokens/sample")
+        out.append(f"   - Overhead: {(ttl_tps / csv_tps - 1) * 100:+.1f}%")
+        out.append("")
+
+    out.append("💡 VALUE PROPOSITION:")
+    out.append("   - 3TL ADDS capabilities CSV lacks (enums, precision, refs)")
+    out.append("   - Best for: complex schemas where explicit types matter")
+    out.append("")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare 3TL and CSV eval results")
+    parser.add_argument(
+        "--model", "-m",
+        help="Only report this model (default: one report per model)",
+    )
+    args = parser.parse_args()
+
+    df = load_results(args.model)
+    if df.attrs["skipped"]:
+        print(f"Skipped {df.attrs['skipped']} logs of runs that errored or were cancelled")
+    if df.empty:
+        print(f"No eval logs found in {log_dir}" + (f" for {args.model}" if args.model else ""))
+        return
+
+    # Tasks are only comparable within one model's runs
+    out = []
+    for model, results in df.groupby("model", sort=True):
+        out.extend(format_report(model, results))
+
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Sample batching (row-marshaling) for eval tasks.
+
+Packs several independent Samples into one numbered prompt so a single model
+call answers all of them, then splits the reply back into per-question answers
+for scoring. This amortizes request latency and prompt prefill across
+questions.
+
+Usage:
+    from batching import batch_samples, batch_scorer
+
+    @task
+    def my_task(batch_size=1):
+        return Task(
+            dataset=batch_samples([...], batch_size),
+            solver=[generate()],
+            scorer=batch_scorer("includes", batch_size),
+        )
+
+With batch_size=1 (the default) samples and scorers are left unchanged.
+"""
+
+import re
+import string
+
+from inspect_ai.dataset import Sample
+from inspect_ai.scorer import Score, Target, accuracy, includes, match, scorer, stderr
+from inspect_ai.solver import TaskState
+
+BATCH_INSTRUCTIONS = (
+    "Answer each of the numbered questions below. Start each answer on a new "
+    "line with the question's number, like \"1) ...\"."
+)
+
+# An answer starts at a line beginning with its question number: "1)", "1." or "1:",
+# optionally in markdown bold ("**1)**"). The number must be followed by whitespace,
+# so a line starting with a value like "3.14" doesn't start answer 3
+_ANSWER_RE = re.compile(r"^\s*(?:\*\*)?(\d+)[).:](?:\*\*)?(?!\S)\s*", re.MULTILINE)
+
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def batch_samples(samples, batch_size):
+    """Group samples into numbered multi-question Samples of up to batch_size each.
+
+    Each batch keeps the original targets, aligned with question order, in
+    metadata["targets"]; its own target lists them for readability in logs.
+    """
+    if batch_size <= 1:
+        return samples
+
+    batches = []
+    for start in range(0, len(samples), batch_size):
+        group = samples[start:start + batch_size]
+        targets = [_as_list(sample.target) for sample in group]
+        questions = "\n\n".join(f"{i}) {sample.input}" for i, sample in enumerate(group, 1))
+        batches.append(Sample(
+            input=f"{BATCH_INSTRUCTIONS}\n\n{questions}",
+            target=[" | ".join(target) for target in targets],
+            metadata={"targets": targets},
+        ))
+    return batches
+
+
+def split_answers(completion, count):
+    """Split a numbered reply into count answers; missing answers are ''."""
+    answers = [""] * count
+    starts = list(_ANSWER_RE.finditer(completion))
+    for current, following in zip(starts, starts[1:] + [None]):
+        index = int(current.group(1)) - 1
+        end = following.start() if following else len(completion)
+        # The first answer given for a number wins
+        if 0 <= index < count and not answers[index]:
+            answers[index] = completion[current.end():end].strip()
+    return answers
+
+
+def _as_list(target):
+    return [target] if isinstance(target, str) else list(target)
+
+
+def _includes(answer, targets):
+    answer = answer.casefold()
+    return any(target.casefold() in answer for target in targets)
+
+
+def _match(answer, targets):
+    # Same defaults as match(): compare the end of the answer, ignoring case and punctuation
+    answer = answer.casefold().translate(_PUNCTUATION).strip()
+    return any(answer.endswith(target.casefold().translate(_PUNCTUATION).strip()) for target in targets)
+
+
+_CHECKS = {"includes": _includes, "match": _match}
+
+
+@scorer(metrics=[accuracy(), stderr()])
+def batched(kind="includes"):
+    """Score each question of a batched sample with an includes()/match() style check.
+
+    The sample's value is the fraction of its questions answered correctly.
+    """
+    check = _CHECKS[kind]
+
+    async def score(state: TaskState, target: Target) -> Score:
+        targets = state.metadata["targets"]
+        answers = split_answers(state.output.completion, len(targets))
+        correct = [check(answer, expected) for answer, expected in zip(answers, targets)]
+        return Score(
+            value=sum(correct) / len(correct),
+            answer="\n".join(f"{i}) {answer}" for i, answer in enumerate(answers, 1)),
+            explanation=state.output.completion,
+            metadata={"correct": correct},
+        )
+
+    return score
+
+
+def batch_scorer(kind, batch_size):
+    """Return the plain includes()/match() scorer, or batched(kind) when batching."""
+    if batch_size <= 1:
+        return {"includes": includes, "match": match}[kind]()
+    return batched(kind)
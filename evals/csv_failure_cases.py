@@ -4,10 +4,52 @@ CSV Failure Cases vs 3TL Success
 Tests scenarios where CSV is ambiguous or fails, but 3TL succeeds.
 """
 
+import functools
+import re
+
 from inspect_ai import Task, eval, task
 from inspect_ai.dataset import Sample
-from inspect_ai.scorer import includes, match
-from inspect_ai.solver import generate
+from inspect_ai.scorer import CORRECT, INCORRECT, Score, Target, accuracy, scorer, stderr
+from inspect_ai.solver import TaskState, generate
+
+# Prompt intros shared by the samples below
+CSV_INTRO = "In this CSV"
+CSV_DATA_INTRO = "In this CSV data"
+THREE_TL_INTRO = "In this 3TL data"
+THREE_TL_SCHEMA_INTRO = "Looking at this 3TL schema"
+
+
+@functools.cache
+def prompt(intro, data, question):
+    """Build a sample prompt: intro, the data block, then the question."""
+    return "".join((intro, ":\n\n", data, "\n\n", question))
+
+
+@functools.cache
+def _target_pattern(targets):
+    """Compile a tuple of target strings into one case-insensitive alternation."""
+    return re.compile("|".join(map(re.escape, targets)), re.IGNORECASE)
+
+
+@scorer(metrics=[accuracy(), stderr()])
+def includes_any():
+    """Like includes(), but checks all targets in a single precompiled regex search.
+
+    includes() casefolds the whole completion once per target; the long target
+    lists here make that the dominant scoring cost.
+    """
+
+    async def score(state: TaskState, target: Target) -> Score:
+        completion = state.output.completion
+        found = _target_pattern(tuple(target.target)).search(completion)
+        return Score(
+            value=CORRECT if found else INCORRECT,
+            answer=found.group(0) if found else completion,
+            explanation=completion,
+        )
+
+    return score
+
 
 # Case 1: Type Ambiguity - Is "123" a string or number?
 CSV_TYPE_AMBIGUOUS = """id,code,amount
@@ -108,16 +150,16 @@ def csv_type_ambiguity():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV data:\n\n{CSV_TYPE_AMBIGUOUS}\n\nIs the 'code' field a string or a number? Be specific.",
+                input=prompt(CSV_DATA_INTRO, CSV_TYPE_AMBIGUOUS, "Is the 'code' field a string or a number? Be specific."),
                 target=["ambiguous", "unclear", "could be", "either", "depends", "not sure"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_TYPE_EXPLICIT}\n\nIs the 'code' field a string or a number?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_TYPE_EXPLICIT, "Is the 'code' field a string or a number?"),
                 target=["string", "str"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -127,16 +169,16 @@ def csv_precision_loss():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_PRECISION_LOST}\n\nWhat is the EXACT precision (number of decimal places) for the tax_rate field?",
+                input=prompt(CSV_INTRO, CSV_PRECISION_LOST, "What is the EXACT precision (number of decimal places) for the tax_rate field?"),
                 target=["can't", "unclear", "ambiguous", "not specified", "lost"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_PRECISION_KEPT}\n\nWhat is the EXACT precision (number of decimal places) for the tax_rate field?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_PRECISION_KEPT, "What is the EXACT precision (number of decimal places) for the tax_rate field?"),
                 target=["3", "decimal(5,3)"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -146,16 +188,16 @@ def csv_boolean_inconsistency():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_BOOLEAN_AMBIGUOUS}\n\nAre the boolean representations consistent? List the different ways booleans are represented.",
+                input=prompt(CSV_INTRO, CSV_BOOLEAN_AMBIGUOUS, "Are the boolean representations consistent? List the different ways booleans are represented."),
                 target=["1/0", "yes/no", "true/false", "inconsistent", "three different"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_BOOLEAN_CLEAR}\n\nHow are boolean values represented?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_BOOLEAN_CLEAR, "How are boolean values represented?"),
                 target=["true", "false", "consistent"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -165,16 +207,16 @@ def csv_null_vs_empty():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_NULL_AMBIGUOUS}\n\nIs Alice's middle_name NULL or an empty string? Can you tell for certain?",
+                input=prompt(CSV_INTRO, CSV_NULL_AMBIGUOUS, "Is Alice's middle_name NULL or an empty string? Can you tell for certain?"),
                 target=["can't tell", "ambiguous", "unclear", "could be either", "not sure"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_NULL_CLEAR}\n\nThe middle_name is declared as 'str?' - what does the '?' mean?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_NULL_CLEAR, "The middle_name is declared as 'str?' - what does the '?' mean?"),
                 target=["nullable", "optional", "can be null"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -184,16 +226,16 @@ def csv_date_format_confusion():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_DATE_AMBIGUOUS}\n\nFor the date '01/02/03', what date does this represent? Is it January 2, 2003 or February 1, 2003? Can you tell?",
+                input=prompt(CSV_INTRO, CSV_DATE_AMBIGUOUS, "For the date '01/02/03', what date does this represent? Is it January 2, 2003 or February 1, 2003? Can you tell?"),
                 target=["ambiguous", "could be", "unclear", "depends", "can't tell", "either"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_DATE_CLEAR}\n\nWhat date format is used?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_DATE_CLEAR, "What date format is used?"),
                 target=["ISO", "YYYY-MM-DD", "2003-01-02", "unambiguous"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -203,20 +245,20 @@ def csv_enum_validation_missing():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_ENUM_UNCHECKED}\n\nIs 'SHIPPED' a valid status value? How can you tell what the valid status values are?",
+                input=prompt(CSV_INTRO, CSV_ENUM_UNCHECKED, "Is 'SHIPPED' a valid status value? How can you tell what the valid status values are?"),
                 target=["can't tell", "unclear", "would need", "infer", "look at", "don't know"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_ENUM_VALIDATED}\n\nWhat are the valid values for the 'status' field?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_ENUM_VALIDATED, "What are the valid values for the 'status' field?"),
                 target=["pending", "shipped", "delivered"]
             ),
             Sample(
-                input=f"Looking at this 3TL schema:\n\n{THREE_TL_ENUM_VALIDATED}\n\nIf I tried to add a row with status='cancelled', would it be valid according to the schema?",
+                input=prompt(THREE_TL_SCHEMA_INTRO, THREE_TL_ENUM_VALIDATED, "If I tried to add a row with status='cancelled', would it be valid according to the schema?"),
                 target=["no", "invalid", "not valid", "not allowed"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -226,16 +268,16 @@ def csv_foreign_key_unclear():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_FK_UNCLEAR}\n\nWhat table and column does 'user_id' reference?",
+                input=prompt(CSV_INTRO, CSV_FK_UNCLEAR, "What table and column does 'user_id' reference?"),
                 target=["can't tell", "unclear", "don't know", "infer", "probably", "assume"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_FK_EXPLICIT}\n\nWhat table and column does 'user_id' reference?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_FK_EXPLICIT, "What table and column does 'user_id' reference?"),
                 target=["User.id", "User table"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -245,16 +287,16 @@ def csv_array_representation():
     return Task(
         dataset=[
             Sample(
-                input=f"In this CSV:\n\n{CSV_ARRAY_MESSY}\n\nHow are the tags represented? Is this a single string or an array?",
+                input=prompt(CSV_INTRO, CSV_ARRAY_MESSY, "How are the tags represented? Is this a single string or an array?"),
                 target=["string", "comma", "quoted", "ambiguous", "not clear"]
             ),
             Sample(
-                input=f"In this 3TL data:\n\n{THREE_TL_ARRAY_CLEAN}\n\nWhat is the type of the 'tags' field?",
+                input=prompt(THREE_TL_INTRO, THREE_TL_ARRAY_CLEAN, "What is the type of the 'tags' field?"),
                 target=["array", "str[]", "list"]
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -264,7 +306,7 @@ def csv_schema_inference_wrong():
     return Task(
         dataset=[
             Sample(
-                input=f"""Given this CSV with 2 rows:
+                input="""Given this CSV with 2 rows:
 
 id,code
 1,123
@@ -278,7 +320,7 @@ What problem does this cause?""",
                 target=["breaks", "error", "fail", "type", "mismatch", "wrong"]
             ),
             Sample(
-                input=f"""In 3TL, the schema is declared upfront:
+                input="""In 3TL, the schema is declared upfront:
 
 #! Data
 #@ id:uint, code:str
@@ -291,7 +333,7 @@ Why doesn't row 3 cause a problem here?""",
             ),
         ],
         solver=[generate()],
-        scorer=includes(),
+        scorer=includes_any(),
     )
 
 
@@ -310,4 +352,7 @@ if __name__ == "__main__":
             csv_schema_inference_wrong(),
         ],
         model="anthropic/claude-3-5-haiku-20241022",
+        max_connections=48,
+        max_samples=48,
+        max_tasks=4,
     )
@@ -6,6 +6,8 @@ Usage:
     python run_evals.py --model gpt-4
     python run_evals.py --model claude-3-5-sonnet-20241022
     python run_evals.py --all-tasks
+    python run_evals.py --all-tasks --parallel 4
+    python run_evals.py --all-tasks --batch-size 8
 """
 
 import argparse
@@ -44,6 +46,13 @@ MODELS = {
     "claude-3-haiku": "anthropic/claude-3-haiku-20240307",
 }
 
+# Model provider prefix -> API key environment variable
+PROVIDER_API_KEYS = {
+    "openai/": "OPENAI_API_KEY",
+    "anthropic/": "ANTHROPIC_API_KEY",
+    "google/": "GOOGLE_API_KEY",
+}
+
 # Task groups
 TASK_GROUPS = {
     "type-inference": [type_inference_csv, type_reading_3tl],
@@ -71,9 +80,41 @@ ALL_TASKS = [
 ]
 
 
+def run_tasks(tasks, model, log_dir, max_tasks, batch_size=1):
+    """Run all tasks in a single eval() call, up to max_tasks at a time.
+
+    One call shares model setup and connection pools across tasks; inspect_ai
+    also rejects concurrent eval() calls, so concurrency is left to its own
+    task scheduler.
+    """
+    print(f"Running {len(tasks)} tasks, up to {max_tasks} at a time")
+
+    try:
+        logs = eval(
+            [task_fn(batch_size=batch_size) for task_fn in tasks],
+            model=model,
+            log_dir=log_dir,
+            max_tasks=max_tasks,
+        )
+    except Exception as e:
+        print(f"❌ Evaluation failed: {e}")
+        print()
+        return
+
+    for log in logs:
+        task_name = log.eval.task
+        if log.status == "success":
+            print(f"✅ {task_name} completed")
+        else:
+            error = log.error.message if log.error else log.status
+            print(f"❌ {task_name} failed: {error}")
+    print()
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Run 3TL vs CSV comprehension evaluations"
+        description="Run 3TL vs CSV comprehension evaluations",
+        epilog="All selected tasks share a single eval() run and log directory.",
     )
     parser.add_argument(
         "--model",
@@ -97,21 +138,32 @@ def main():
         default="./logs",
         help="Directory for evaluation logs (default: ./logs)",
     )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of tasks to run concurrently (default: 1, one at a time)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Ask K samples per model call as one numbered prompt (default: 1, no batching)",
+    )
 
     args = parser.parse_args()
 
-    # Check for API keys
-    if "openai" in MODELS[args.model] and not os.getenv("OPENAI_API_KEY"):
-        print("⚠️  Warning: OPENAI_API_KEY not found in environment")
-        print("   Set it in .env file or as environment variable")
-        return
+    model = MODELS[args.model]
 
-    if "anthropic" in MODELS[args.model] and not os.getenv("ANTHROPIC_API_KEY"):
-        print("⚠️  Warning: ANTHROPIC_API_KEY not found in environment")
-        print("   Set it in .env file or as environment variable")
-        return
+    # Check for API keys
+    for prefix, env_var in PROVIDER_API_KEYS.items():
+        if model.startswith(prefix) and not os.getenv(env_var):
+            print(f"⚠️  Warning: {env_var} not found in environment")
+            print("   Set it in .env file or as environment variable")
+            return
 
-    model = MODELS[args.model]
     print(f"🚀 Running evaluations with {model}")
     print(f"📝 Logs will be saved to {args.log_dir}")
     print()
@@ -127,21 +179,7 @@ def main():
     print()
 
     # Run evaluations
-    for task_fn in tasks:
-        task_name = task_fn.__name__
-        print(f"Running: {task_name}")
-
-        try:
-            results = eval(
-                task_fn(),
-                model=model,
-                log_dir=args.log_dir,
-            )
-            print(f"✅ {task_name} completed")
-            print()
-        except Exception as e:
-            print(f"❌ {task_name} failed: {e}")
-            print()
+    run_tasks(tasks, model, args.log_dir, args.parallel, args.batch_size)
 
     print("✨ All evaluations complete!")
     print(f"📊 View results in {args.log_dir}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test sample batching and the batched scorer (without calling APIs)
+"""
+
+import asyncio
+
+from inspect_ai.dataset import Sample
+from inspect_ai.model import ModelOutput
+from inspect_ai.scorer import CORRECT, Target
+from inspect_ai.solver import TaskState
+
+from batching import batch_samples, batch_scorer, batched, split_answers
+
+MODEL = "mockllm/model"
+
+
+def test_split_answers():
+    """Answers are routed back to their question numbers"""
+    cases = [
+        ("1) yes\n2) no\n3) maybe", 3, ["yes", "no", "maybe"]),
+        ("1. yes\n2: no", 2, ["yes", "no"]),
+        ("  1)  yes\n\n  2)  no  ", 2, ["yes", "no"]),
+        # Answers may span lines, and missing or out-of-range answers are ignored
+        ("1) first line\nsecond line\n3) three\n4) extra", 3, ["first line\nsecond line", "", "three"]),
+        # A repeated number keeps its first answer
+        ("1) kept\n1) dropped", 1, ["kept"]),
+        # Markdown bold numbers
+        ("**1)** yes\n**2.** no", 2, ["yes", "no"]),
+        # A value at the start of a line is not a question number
+        ("1) The value is\n3.14 exactly\n2) 10:30", 2, ["The value is\n3.14 exactly", "10:30"]),
+        ("no numbers here", 2, ["", ""]),
+    ]
+    for completion, count, expected in cases:
+        answers = split_answers(completion, count)
+        assert answers == expected, f"{completion!r}: got {answers}"
+
+
+def test_batch_samples():
+    """Samples are numbered into batches that keep their targets in order"""
+    samples = [Sample(input=f"Question {i}", target=f"answer {i}") for i in range(5)]
+    assert batch_samples(samples, 1) is samples
+
+    batches = batch_samples(samples, 2)
+    assert len(batches) == 3, f"Expected 3 batches, got {len(batches)}"
+    assert "1) Question 0\n\n2) Question 1" in batches[0].input
+    assert batches[0].metadata["targets"] == [["answer 0"], ["answer 1"]]
+    assert batches[2].metadata["targets"] == [["answer 4"]]
+
+
+def _state(completion, targets=None):
+    return TaskState(
+        model=MODEL,
+        sample_id=1,
+        epoch=1,
+        input="",
+        messages=[],
+        output=ModelOutput.from_content(MODEL, completion),
+        metadata={"targets": targets} if targets else {},
+    )
+
+
+def _score(kind, completion, targets):
+    state = _state(completion, targets)
+    return asyncio.run(batched(kind)(state, Target([" | ".join(t) for t in targets])))
+
+
+def test_batched_scorer():
+    """Each question is scored on its own and the sample scores the fraction correct"""
+    targets = [["Paris"], ["4", "four"], ["blue"]]
+
+    score = _score("includes", "1) It is Paris.\n2) Four\n3) red", targets)
+    assert score.metadata["correct"] == [True, True, False], f"Got {score.metadata['correct']}"
+    assert score.value == 2 / 3, f"Got {score.value}"
+    assert score.answer == "1) It is Paris.\n2) Four\n3) red"
+
+    score = _score("match", "1) The capital is Paris\n2) 2 + 2 = 4\n3) **Blue**", targets)
+    assert score.metadata["correct"] == [True, True, True], f"Got {score.metadata['correct']}"
+    assert score.value == 1.0
+
+    # Answers the reply leaves out are scored wrong
+    score = _score("includes", "2) four", targets)
+    assert score.metadata["correct"] == [False, True, False], f"Got {score.metadata['correct']}"
+
+
+def test_batch_scorer():
+    """Unbatched tasks keep the plain inspect_ai scorers"""
+    score = asyncio.run(batch_scorer("includes", 1)(_state("It is Paris."), Target("Paris")))
+    assert score.value == CORRECT, f"Got {score.value}"
+
+    score = asyncio.run(batch_scorer("includes", 2)(_state("1) Paris", [["Paris"]]), Target("Paris")))
+    assert score.value == 1.0, f"Got {score.value}"
+
+
+def main():
+    tests = [test_split_answers, test_batch_samples, test_batched_scorer, test_batch_scorer]
+
+    print("Testing sample batching...\n")
+
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__} FAILED: {e}")
+            return 1
+        except Exception as e:
+            print(f"✗ {test.__name__} ERROR: {e}")
+            return 1
+
+    print(f"\n✅ All {len(tests)} batching tests passed")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,17 +5,14 @@ Tests whether LLMs better understand structured data in 3TL format vs plain CSV.
 Demonstrates advantages of 3TL: type information, schemas, relationships, etc.
 """
 
-import os
-from pathlib import Path
-from dotenv import load_dotenv
+import functools
+import inspect
 
 from inspect_ai import Task, eval, task
 from inspect_ai.dataset import Sample
-from inspect_ai.scorer import match, includes
 from inspect_ai.solver import generate, system_message
 
-# Load environment variables from .env
-load_dotenv()
+from batching import batch_samples, batch_scorer
 
 # Sample data for testing
 CSV_USERS = """id,name,email,role,active
@@ -50,11 +47,28 @@ THREE_TL_PRODUCTS_ORDERS = """#! Product
 2, 2, 2, 3, 59.97"""
 
 
+def _cached_task(task_fn):
+    """Memoize a task function on its arguments with defaults filled in."""
+    # Binding the arguments first gives task_fn() and task_fn(batch_size=1) one cache
+    # entry, so repeat calls (e.g. test_structure.py then an eval run) share one Task.
+    # eval() only fills in missing sample ids, so reusing a Task across runs is safe.
+    cached = functools.cache(task_fn)
+    signature = inspect.signature(task_fn)
+
+    @functools.wraps(task_fn)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return cached(*bound.args, **bound.kwargs)
+    return wrapper
+
+
 @task
-def type_inference_csv():
+@_cached_task
+def type_inference_csv(batch_size=1):
     """Test if LLM can infer correct types from CSV data"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given this CSV data:\n\n{CSV_USERS}\n\nWhat is the data type of the 'id' column? Answer with just the type name (e.g., integer, string, boolean, etc.)",
                 target="integer"
@@ -63,17 +77,18 @@ def type_inference_csv():
                 input=f"Given this CSV data:\n\n{CSV_USERS}\n\nWhat is the data type of the 'active' column? Answer with just the type name.",
                 target="boolean"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def type_reading_3tl():
+@_cached_task
+def type_reading_3tl(batch_size=1):
     """Test if LLM can read types directly from 3TL schema"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given this 3TL data:\n\n{THREE_TL_USERS}\n\nWhat is the data type of the 'id' column? Answer with just the type name from the schema.",
                 target="uint"
@@ -86,32 +101,34 @@ def type_reading_3tl():
                 input=f"Given this 3TL data:\n\n{THREE_TL_USERS}\n\nWhat is the data type of the 'role' column? Include the full type definition.",
                 target="enum(admin|user|moderator)"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def relationship_inference_csv():
+@_cached_task
+def relationship_inference_csv(batch_size=1):
     """Test if LLM can identify foreign key relationships in CSV"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given these CSV files:\n\n{CSV_PRODUCTS_ORDERS}\n\nWhat is the relationship between the 'user_id' column in orders.csv and the users? Describe the foreign key relationship in one sentence.",
                 target=["references", "foreign key", "User", "id"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def relationship_reading_3tl():
+@_cached_task
+def relationship_reading_3tl(batch_size=1):
     """Test if LLM can read explicit relationships from 3TL"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given this 3TL data:\n\n{THREE_TL_PRODUCTS_ORDERS}\n\nWhat table and column does 'user_id' reference? Answer in format: Table.column",
                 target="User.id"
@@ -120,17 +137,18 @@ def relationship_reading_3tl():
                 input=f"Given this 3TL data:\n\n{THREE_TL_PRODUCTS_ORDERS}\n\nWhat table and column does 'product_id' reference? Answer in format: Table.column",
                 target="Product.id"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=match(),
+        scorer=batch_scorer("match", batch_size),
     )
 
 
 @task
-def schema_generation_comparison():
+@_cached_task
+def schema_generation_comparison(batch_size=1):
     """Test quality of schema generation in both formats"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input="Create a CSV schema (just the header row) for a blog post with: an ID, title, content, author name, publication date, and published status.",
                 target="id,title,content,author,date,published"
@@ -139,14 +157,15 @@ def schema_generation_comparison():
                 input="Create a 3TL schema definition for a blog post with: an ID (unsigned integer), title (string), content (nullable string), author name (string), publication date (date type), and published status (boolean).",
                 target=["#@ id:uint", "title:str", "content:str?", "published:bool", "date"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def data_validation_csv():
+@_cached_task
+def data_validation_csv(batch_size=1):
     """Test if LLM can spot type errors in CSV"""
     csv_invalid = """id,name,price,active
 1,Widget,19.99,true
@@ -154,19 +173,20 @@ def data_validation_csv():
 3,Thing,29.99,true"""
 
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Find the data validation errors in this CSV:\n\n{csv_invalid}\n\nList any values that don't match expected types.",
                 target=["not-a-number", "yes", "price", "active"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def data_validation_3tl():
+@_cached_task
+def data_validation_3tl(batch_size=1):
     """Test if LLM can spot type errors in 3TL"""
     three_tl_invalid = """#! Product
 #@ id:uint, name:str, price:decimal(10,2), active:bool
@@ -175,22 +195,23 @@ def data_validation_3tl():
 3, Thing, 29.99, true"""
 
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Find the data validation errors in this 3TL data:\n\n{three_tl_invalid}\n\nList any values that don't match their declared types.",
                 target=["not-a-number", "yes", "row 2", "Gadget"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def precision_understanding():
+@_cached_task
+def precision_understanding(batch_size=1):
     """Test if LLM understands precision specs (3TL advantage)"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input="In 3TL, what does 'decimal(10,2)' mean? Explain the two numbers.",
                 target=["10", "precision", "2", "scale", "digits"]
@@ -199,32 +220,34 @@ def precision_understanding():
                 input=f"Given this 3TL schema:\n\n#@ price:decimal(10,2)\n\nWhat is the maximum value that can be stored in 'price'?",
                 target=["99999999.99", "8 digits", "2 decimal"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def multi_table_csv():
+@_cached_task
+def multi_table_csv(batch_size=1):
     """Test understanding of multi-table data in CSV format"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given these CSV files:\n\n{CSV_PRODUCTS_ORDERS}\n\nHow many different files/tables are represented here?",
                 target="2"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def multi_table_3tl():
+@_cached_task
+def multi_table_3tl(batch_size=1):
     """Test understanding of multi-table data in 3TL format"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given this 3TL data:\n\n{THREE_TL_PRODUCTS_ORDERS}\n\nHow many tables are defined in this file?",
                 target="2"
@@ -233,17 +256,18 @@ def multi_table_3tl():
                 input=f"Given this 3TL data:\n\n{THREE_TL_PRODUCTS_ORDERS}\n\nList the table names in order.",
                 target=["Product", "Order"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def enum_understanding():
+@_cached_task
+def enum_understanding(batch_size=1):
     """Test if LLM understands enum constraints (3TL-only feature)"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Given this 3TL data:\n\n{THREE_TL_USERS}\n\nWhat are the valid values for the 'role' column?",
                 target=["admin", "user", "moderator"]
@@ -252,15 +276,16 @@ def enum_understanding():
                 input=f"Given this 3TL data:\n\n{THREE_TL_USERS}\n\nIf someone tried to insert a user with role='superuser', would it be valid?",
                 target=["no", "invalid", "not valid", "not allowed"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 # Comparison suite that runs all evals
 @task
-def three_tl_comprehension_suite():
+@_cached_task
+def three_tl_comprehension_suite(batch_size=1):
     """
     Comprehensive suite comparing LLM understanding of 3TL vs CSV.
 
@@ -273,7 +298,7 @@ def three_tl_comprehension_suite():
     6. Better validation error detection
     """
     return Task(
-        dataset=[
+        dataset=batch_samples([
             # Type clarity
             Sample(
                 input=f"Compare these two representations of the same data:\n\nCSV:\n{CSV_USERS}\n\n3TL:\n{THREE_TL_USERS}\n\nWhich format makes the data types explicitly clear without inference?",
@@ -293,15 +318,23 @@ def three_tl_comprehension_suite():
                 input=f"Can you tell from this 3TL what values are allowed in the 'role' column?\n\n{THREE_TL_USERS}",
                 target=["yes", "admin", "user", "moderator", "enum"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env (importers such as run_evals.py load their own)
+    load_dotenv()
+
     # Run the comprehensive comparison suite
     eval(
         three_tl_comprehension_suite(),
         model="openai/gpt-4",  # Change to anthropic/claude-3-5-sonnet-20241022 or other models
+        # Independent samples fan out concurrently; lower these if the provider rate-limits
+        max_connections=48,
+        max_samples=48,
     )
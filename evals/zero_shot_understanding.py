@@ -9,9 +9,10 @@ This tests if the syntax is intuitive and self-explanatory.
 
 from inspect_ai import Task, eval, task
 from inspect_ai.dataset import Sample
-from inspect_ai.scorer import includes, match
 from inspect_ai.solver import generate
 
+from batching import batch_samples, batch_scorer
+
 # Sample 3TL data with NO context or explanation
 PRODUCT_DATA = """#! Product
 #@ id:uint, name:str, price:decimal(10,2), category:enum(Electronics|Books|Toys), in_stock:bool
@@ -31,25 +32,25 @@ USER_ORDER_DATA = """#! User
 
 
 @task
-def zero_shot_format_recognition():
+def zero_shot_format_recognition(batch_size=1):
     """Can the model recognize what format this is?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"What data format is this?\n\n{PRODUCT_DATA}",
                 target=["3TL", "typed", "schema", "table", "structured"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def zero_shot_structure_understanding():
+def zero_shot_structure_understanding(batch_size=1):
     """Can the model understand the structure without explanation?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Looking at this data:\n\n{PRODUCT_DATA}\n\nWhat does the line starting with '#!' represent?",
                 target=["table", "name", "definition", "header", "entity"]
@@ -62,17 +63,17 @@ def zero_shot_structure_understanding():
                 input=f"Looking at this data:\n\n{PRODUCT_DATA}\n\nHow many products are in this data?",
                 target="3"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def zero_shot_type_understanding():
+def zero_shot_type_understanding(batch_size=1):
     """Can the model understand type syntax without explanation?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Looking at this data:\n\n{PRODUCT_DATA}\n\nWhat does 'uint' mean for the id field?",
                 target=["unsigned", "integer", "positive", "number", "whole"]
@@ -85,17 +86,17 @@ def zero_shot_type_understanding():
                 input=f"Looking at this data:\n\n{PRODUCT_DATA}\n\nWhat does 'enum(Electronics|Books|Toys)' mean for the category field?",
                 target=["Electronics", "Books", "Toys", "valid", "allowed", "one of"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def zero_shot_relationship_understanding():
+def zero_shot_relationship_understanding(batch_size=1):
     """Can the model understand ref() syntax without explanation?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Looking at this data:\n\n{USER_ORDER_DATA}\n\nWhat does 'ref(User.id)' mean for the user_id field in the Order table?",
                 target=["reference", "User", "id", "foreign key", "relationship", "points to"]
@@ -104,17 +105,17 @@ def zero_shot_relationship_understanding():
                 input=f"Looking at this data:\n\n{USER_ORDER_DATA}\n\nWhich user placed order 101?",
                 target=["Alice", "1"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def zero_shot_data_extraction():
+def zero_shot_data_extraction(batch_size=1):
     """Can the model extract data correctly without explanation?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Looking at this data:\n\n{PRODUCT_DATA}\n\nWhat is the price of the Laptop?",
                 target="999.99"
@@ -127,17 +128,17 @@ def zero_shot_data_extraction():
                 input=f"Looking at this data:\n\n{PRODUCT_DATA}\n\nWhat category is the Robot Toy?",
                 target="Toys"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def zero_shot_syntax_explanation():
+def zero_shot_syntax_explanation(batch_size=1):
     """Can the model explain the syntax after seeing it?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Looking at this data format:\n\n{PRODUCT_DATA}\n\nExplain how the schema definition (the #@ line) works in 2 sentences.",
                 target=["column", "type", "colon", "comma"]
@@ -146,24 +147,24 @@ def zero_shot_syntax_explanation():
                 input=f"Looking at this data format:\n\n{USER_ORDER_DATA}\n\nHow many tables are defined here?",
                 target="2"
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
 @task
-def zero_shot_comparison_to_csv():
+def zero_shot_comparison_to_csv(batch_size=1):
     """Can the model compare to CSV without prompting?"""
     return Task(
-        dataset=[
+        dataset=batch_samples([
             Sample(
                 input=f"Compare this format:\n\n{PRODUCT_DATA}\n\nto regular CSV. What's the main difference?",
                 target=["type", "schema", "explicit", "column", "definition"]
             ),
-        ],
+        ], batch_size),
         solver=[generate()],
-        scorer=includes(),
+        scorer=batch_scorer("includes", batch_size),
     )
 
 
@@ -180,4 +181,7 @@ if __name__ == "__main__":
             zero_shot_comparison_to_csv(),
         ],
         model="anthropic/claude-3-5-haiku-20241022",
+        max_connections=48,
+        max_samples=48,
+        max_tasks=4,
     )
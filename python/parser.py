@@ -13,23 +13,179 @@ Usage:
         print(f"Columns: {table.columns}")
         for row in table.rows:
             print(row)
+
+    # Large files can be parsed one table at a time
+    for table in parser.parse_file_iter("data.3tl"):
+        print(table.name, len(table.rows))
 """
 
+import csv
+import io
+import os
+import re
+import secrets
 import sys
 import argparse
 import json
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from decimal import Decimal
+from functools import lru_cache
+from itertools import chain, repeat
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
-from typing import Optional, Any
+from dataclasses import dataclass, field, replace
+from typing import Optional, Any, BinaryIO, Iterator
+
+from lark import Lark, Transformer, UnexpectedInput, v_args
 
-from lark import Lark, Transformer, Tree, Token
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
 
 
 # Get the grammar file path relative to this script
 GRAMMAR_FILE = Path(__file__).parent.parent / "3tl-grammar.lark"
 
+def grammar_cache_file(grammar_file: Path) -> Path:
+    """Return where the compiled LALR tables for a grammar are cached.
+
+    Lark stores a hash of the grammar and options in the file and rebuilds it
+    when they change, so a stale cache is never used.
+    """
+    return grammar_file.with_suffix('.lark.cache')
+
+
+# Smallest file parse_file_parallel() spreads across processes
+PARALLEL_MIN_BYTES = 64 * 1024
+
+# Parsed documents kept per parser instance, see ThreeTLParser.clear_cache()
+CACHE_SIZE = 128
+
+# Literal values recognized when converting data fields
+_NULLS = frozenset(('', 'null'))
+_BOOLS = {'true': True, 'false': False}
+_INT_RE = re.compile(r'[-+]?\d+')
+_FLOAT_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+# Marks decimals in _dump_json() output; random, so no string in the data can carry it
+_DECIMAL_TAG = secrets.token_hex(16)
+_DECIMAL_RE = re.compile(b'"' + _DECIMAL_TAG.encode() + rb'([^"]+)"')
+
+# One field of a data row holding quotes, as the grammar allows it: a quoted field with
+# optional whitespace around it, or an unquoted one without quotes, then its separator
+_FIELD_RE = re.compile(r'[ \t]*(?:"((?:[^"]|"")*)"[ \t]*|([^",\r\n]*))(,|\r?\n|\Z)')
+
+
+# Fast path for the common header and schema lines: ASCII names with plain or decimal
+# types. Anything else (Unicode names, ref, enum, errors) is left to the grammar.
+_HEADER_RE = re.compile(r'#![ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*\r?\n?')
+_SCHEMA_RE = re.compile(r'#@[ \t]*')
+_COLUMN_RE = re.compile(
+    r'([A-Za-z_][A-Za-z0-9_]*)[ \t]*:[ \t]*'
+    r'(?:(i8|i16|i32|i64|int|u8|u16|u32|u64|uint|f32|f64|float|bool|str|text|datetime|timestamp|date|time)'
+    r'|decimal[ \t]*\([ \t]*(\d+)[ \t]*,[ \t]*(\d+)[ \t]*\))'
+    r'(\[\]\??|\?(?:\[\])?)?[ \t]*(?:,[ \t]*(?=[A-Za-z_])|\r?\n?$)',
+    re.IGNORECASE,
+)
+
+
+def _field_converter(convert):
+    """Wrap a converter of stripped, non-null field text with null handling."""
+    def converter(value: str) -> Any:
+        value_str = value.strip()
+        if value_str.lower() in _NULLS:
+            return None
+        return convert(value_str)
+    return converter
+
+
+# Low-cardinality columns (flags, enums) repeat a few values, so their converted values
+# are cached; ids, text and numbers are mostly distinct and would only churn the cache
+_cached_converter = lru_cache(maxsize=256)
+
+
+@_field_converter
+def _convert_value(value_str: str) -> Any:
+    """Guess the type of a field without a known column type: bool, int, float or str."""
+    lowered = value_str.lower()
+    if lowered in _BOOLS:
+        return _BOOLS[lowered]
+    if _INT_RE.fullmatch(value_str):
+        return int(value_str)
+    if _FLOAT_RE.fullmatch(value_str):
+        return float(value_str)
+    return value_str
+
+
+# Values that don't fit their column type are kept as strings so they can be reported
+
+@_field_converter
+def _convert_int(value_str: str) -> Any:
+    return int(value_str) if _INT_RE.fullmatch(value_str) else value_str
+
+
+@_field_converter
+def _convert_float(value_str: str) -> Any:
+    return float(value_str) if _FLOAT_RE.fullmatch(value_str) else value_str
+
+
+@_field_converter
+def _convert_decimal(value_str: str) -> Any:
+    # Decimal keeps the exact digits; out-of-range values are kept too, for validation to report
+    return Decimal(value_str) if _FLOAT_RE.fullmatch(value_str) else value_str
 
-@dataclass
+
+@_cached_converter
+@_field_converter
+def _convert_bool(value_str: str) -> Any:
+    return _BOOLS.get(value_str.lower(), value_str)
+
+
+@_field_converter
+def _convert_str(value_str: str) -> Any:
+    return value_str
+
+
+@_cached_converter
+@_field_converter
+def _convert_enum(value_str: str) -> Any:
+    # Enum values are identifiers, interned like the ones in the schema
+    return sys.intern(value_str)
+
+
+# Column base type -> field converter; other types (ref, timestamp, arrays) are guessed
+_CONVERTERS = {
+    **dict.fromkeys(('i8', 'i16', 'i32', 'i64', 'int', 'u8', 'u16', 'u32', 'u64', 'uint'), _convert_int),
+    **dict.fromkeys(('f32', 'f64', 'float'), _convert_float),
+    'decimal': _convert_decimal,
+    'bool': _convert_bool,
+    **dict.fromkeys(('str', 'text', 'date', 'time', 'datetime'), _convert_str),
+    'enum': _convert_enum,
+}
+
+
+def _column_converter(type_info: 'TypeInfo'):
+    """Return the field converter for a column type."""
+    if type_info.is_array:
+        return _convert_value
+    return _CONVERTERS.get(type_info.base_type, _convert_value)
+
+
+def _convert_columns(columns: list['Column'], rows: list[list[str]]) -> list[list[Any]]:
+    """Convert rows of raw field text into one list of values per column."""
+    # Pad short rows with empty fields so the rows transpose into equal-length columns
+    width = max(len(columns), max(map(len, rows), default=0))
+    rows = [row if len(row) == width else row + [''] * (width - len(row)) for row in rows]
+    fields = list(zip(*rows)) or [()] * width
+
+    # Convert a column at a time now that the schema is known;
+    # fields beyond the schema fall back to guessing
+    converters = chain((_column_converter(col.type) for col in columns), repeat(_convert_value))
+    return [list(map(convert, values)) for convert, values in zip(converters, fields)]
+
+
+@dataclass(slots=True)
 class TypeInfo:
     """Type information for a column."""
     base_type: str  # e.g., "int", "str", "decimal"
@@ -55,19 +211,91 @@ class TypeInfo:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class Column:
     """Column definition."""
     name: str
     type: TypeInfo
 
 
-@dataclass
+def _match_header(line: str) -> Optional['Table']:
+    """Parse a simple table header line, or return None to leave it to the grammar."""
+    match = _HEADER_RE.fullmatch(line)
+    return Table(name=sys.intern(match.group(1))) if match else None
+
+
+def _match_schema(line: str) -> Optional[list[Column]]:
+    """Parse a schema line of plain and decimal types, or return None to leave it to the grammar."""
+    pos = _SCHEMA_RE.match(line).end()
+    columns = []
+    while pos < len(line):
+        match = _COLUMN_RE.match(line, pos)
+        if match is None:
+            return None
+        name, base_type, precision, scale, modifier = match.groups()
+        if base_type is None:
+            type_info = TypeInfo(base_type='decimal', params={'precision': int(precision), 'scale': int(scale)})
+        else:
+            type_info = TypeInfo(base_type=base_type.lower())
+        if modifier:
+            type_info.is_array = '[' in modifier
+            type_info.is_nullable = '?' in modifier
+        columns.append(Column(name=sys.intern(name), type=type_info))
+        pos = match.end()
+    return columns or None
+
+
+@dataclass(slots=True, init=False)
 class Table:
-    """Table with schema and data."""
+    """Table with schema and data, stored column by column.
+
+    Rows can still be passed in, positionally or as rows=; they're stored as columns.
+    """
     name: str
-    columns: list[Column] = field(default_factory=list)
-    rows: list[list[Any]] = field(default_factory=list)
+    columns: list[Column]
+    data: list[list[Any]]  # One list of values per column
+
+    def __init__(
+        self,
+        name: str,
+        columns: Optional[list[Column]] = None,
+        rows: Optional[list[list[Any]]] = None,
+        *,
+        data: Optional[list[list[Any]]] = None,
+    ):
+        if rows is not None and data is not None:
+            raise TypeError("Table() takes rows or data, not both")
+        self.name = name
+        self.columns = columns if columns is not None else []
+        self.data = data if data is not None else []
+        if rows is not None:
+            self.rows = rows
+
+    @property
+    def rows(self) -> list[list[Any]]:
+        """Row-major copy of the data; edits to it don't reach the table, use append_row() or assign rows."""
+        return [list(row) for row in zip(*self.data)]
+
+    @rows.setter
+    def rows(self, rows: list[list[Any]]):
+        self.data = []
+        for row in rows:
+            self.append_row(row)
+
+    def column(self, name: str) -> list[Any]:
+        """Return the values of the named column."""
+        for index, col in enumerate(self.columns):
+            if col.name == name:
+                return self.data[index] if index < len(self.data) else []
+        raise KeyError(name)
+
+    def append_row(self, row: list[Any]):
+        """Append a row, padding it or the existing columns with None to keep the table rectangular."""
+        height = len(self.data[0]) if self.data else 0
+        while len(self.data) < len(row):
+            self.data.append([None] * height)
+        for index, values in enumerate(self.data):
+            values.append(row[index] if index < len(row) else None)
 
     def to_dict(self):
         """Convert to dictionary."""
@@ -78,7 +306,7 @@ class Table:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     """3TL document containing multiple tables."""
     tables: list[Table] = field(default_factory=list)
@@ -91,61 +319,72 @@ class Document:
 
     def to_json(self, indent=2):
         """Convert to JSON string."""
-        return json.dumps(self.to_dict(), indent=indent)
+        buffer = io.BytesIO()
+        self.write_json(buffer, indent=indent)
+        return buffer.getvalue().decode('utf-8')
+
+    def write_json(self, fp: BinaryIO, indent=2):
+        """Write JSON to a binary file, serializing one table at a time."""
+        if not self.tables:
+            fp.write(_dump_json({'tables': []}, indent))
+            return
+
+        if indent is None:
+            start, separator, end = b'{"tables":[', b',', b']}'
+            pad = b'\n'
+        else:
+            # Tables sit two levels deep; JSON strings never hold a raw newline,
+            # so re-indenting each table's output is a plain replace
+            pad = b'\n' + b' ' * (2 * indent)
+            start = b'{\n' + b' ' * indent + b'"tables": [' + pad
+            separator = b',' + pad
+            end = b'\n' + b' ' * indent + b']\n}'
+
+        fp.write(start)
+        for index, table in enumerate(self.tables):
+            if index:
+                fp.write(separator)
+            fp.write(_dump_json(table.to_dict(), indent).replace(b'\n', pad))
+        fp.write(end)
+
+
+def _dump_json(data: Any, indent) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, with decimals as exact JSON numbers."""
+    # Neither encoder writes a Decimal as a number without going through float, so
+    # finite decimals are written as tagged strings and the tags stripped afterwards.
+    # orjson only indents by 2; it also rejects integers beyond 64 bits
+    tagged = []
+
+    def default(obj):
+        if isinstance(obj, Decimal) and obj.is_finite():
+            tagged.append(obj)
+            return f'{_DECIMAL_TAG}{obj}'
+        return str(obj)
+
+    output = None
+    if orjson is not None and indent in (None, 2):
+        try:
+            output = orjson.dumps(data, default=default, option=orjson.OPT_INDENT_2 if indent else 0)
+        except orjson.JSONEncodeError:
+            pass
+    if output is None:
+        separators = (',', ':') if indent is None else None
+        output = json.dumps(data, indent=indent, separators=separators, ensure_ascii=False, default=default).encode('utf-8')
+    return _DECIMAL_RE.sub(rb'\1', output) if tagged else output
 
 
 class ThreeTLTransformer(Transformer):
     """Transform parse tree into 3TL data structures."""
 
-    def __init__(self):
-        super().__init__()
-        self.current_table: Optional[Table] = None
-
-    def three_tl_file(self, items):
-        """Process the entire file."""
-        tables = [item for item in items if isinstance(item, Table)]
-        return Document(tables=tables)
-
-    def element(self, items):
-        """Process an element (table or comment)."""
-        return items[0] if items else None
-
-    def table_block(self, items):
-        """Process a table block."""
-        table = None
-
-        for item in items:
-            if isinstance(item, Table):
-                table = item
-            elif isinstance(item, Column):
-                # Individual column from schema
-                if table:
-                    table.columns.append(item)
-            elif isinstance(item, list):
-                # Check if it's a list of columns (schema) or data row
-                if item and isinstance(item[0], Column):
-                    # Schema definition
-                    if table:
-                        table.columns = item
-                elif table:
-                    # Data row
-                    table.rows.append(item)
-
-        return table
-
-    def table_header(self, items):
+    @v_args(inline=True)
+    def table_header(self, name):
         """Process table header: #! TableName"""
-        name = ''.join(str(item) for item in items if item)
         return Table(name=name)
 
-    def schema_def(self, items):
+    @v_args(inline=True)
+    def schema_def(self, columns):
         """Process schema definition: #@ col:type, col:type"""
-        # Filter out None items and find the list of columns
-        for item in items:
-            if isinstance(item, list):
-                # Filter out None values from the column list
-                return [col for col in item if col is not None]
-        return []
+        return columns
 
     def col_defs(self, items):
         """Process column definitions."""
@@ -157,9 +396,11 @@ class ThreeTLTransformer(Transformer):
         type_info = items[1]
         return Column(name=name, type=type_info)
 
-    def identifier(self, items):
+    @v_args(inline=True)
+    def identifier(self, name):
         """Process identifier."""
-        return ''.join(str(item) for item in items)
+        # Table, column, enum and ref names are interned so repeated names share one object
+        return sys.intern(str(name))
 
     def type_expr(self, items):
         """Process type expression."""
@@ -219,39 +460,25 @@ class ThreeTLTransformer(Transformer):
         """Process time type."""
         return TypeInfo(base_type=str(items[0]).lower())
 
-    def decimal_type(self, items):
+    @v_args(inline=True)
+    def decimal_type(self, precision, scale):
         """Process decimal type: decimal(p,s)."""
-        # Extract precision and scale from items
-        digits = [str(item) for item in items if str(item).isdigit()]
-        precision = int(digits[0]) if len(digits) > 0 else 10
-        scale = int(digits[1]) if len(digits) > 1 else 2
-
         return TypeInfo(
             base_type='decimal',
-            params={'precision': precision, 'scale': scale}
+            params={'precision': int(precision), 'scale': int(scale)}
         )
 
-    def ref_type(self, items):
+    @v_args(inline=True)
+    def ref_type(self, table, column):
         """Process ref type: ref(Table.column)."""
-        # Filter out tokens and keep only identifiers (strings)
-        identifiers = [item for item in items if isinstance(item, str) and item != 'ref']
-        table = identifiers[0] if len(identifiers) > 0 else ''
-        column = identifiers[1] if len(identifiers) > 1 else ''
-
         return TypeInfo(
             base_type='ref',
             params={'table': table, 'column': column}
         )
 
-    def enum_type(self, items):
+    @v_args(inline=True)
+    def enum_type(self, values):
         """Process enum type: enum(val1|val2|val3)."""
-        # Filter out the 'enum' keyword and extract the list
-        values = []
-        for item in items:
-            if isinstance(item, list):
-                values = item
-                break
-
         return TypeInfo(
             base_type='enum',
             params={'values': values}
@@ -260,77 +487,45 @@ class ThreeTLTransformer(Transformer):
     def enum_values(self, items):
         """Process enum values."""
         # Items are identifier strings
-        return [item for item in items if isinstance(item, str)]
-
-    def data_row(self, items):
-        """Process data row."""
-        # Keep all fields, including empty ones
-        return [self._clean_field(item) for item in items]
-
-    def field(self, items):
-        """Process field."""
-        # Return the first non-None item, or None if all are None
-        for item in items:
-            if item is not None:
-                return item
-        return ''  # Empty field
-
-    def quoted_field(self, items):
-        """Process quoted field."""
-        if items and isinstance(items[0], Token):
-            # Remove surrounding quotes and unescape doubled quotes
-            value = str(items[0])
-            if value.startswith('"') and value.endswith('"'):
-                value = value[1:-1]
-            value = value.replace('""', '"')
-            return value
-        return str(items[0]) if items else ''
-
-    def unquoted_field(self, items):
-        """Process unquoted field."""
-        return str(items[0]).strip() if items else ''
-
-    def _clean_field(self, value):
-        """Clean and convert field value."""
-        if value is None or value == '':
-            return None
-
-        # Try to detect type and convert
-        value_str = str(value).strip()
-
-        if value_str.lower() in ('null', ''):
-            return None
-
-        # Try boolean
-        if value_str.lower() in ('true', 'false'):
-            return value_str.lower() == 'true'
-
-        # Try integer
-        try:
-            if '.' not in value_str:
-                return int(value_str)
-        except ValueError:
-            pass
-
-        # Try float
-        try:
-            return float(value_str)
-        except ValueError:
-            pass
-
-        # Return as string
-        return value_str
-
-    # Ignore whitespace and line breaks
-    def WS(self, items):
-        return None
+        return items
 
-    def LINE_BREAK(self, items):
-        return None
 
-    def comment_line(self, items):
-        """Ignore comments."""
-        return None
+class _LineFeed:
+    """Line source for the table loop, handing csv.reader one complete data row at a time."""
+
+    def __init__(self, lines: Iterator[str], line_num: int = 0):
+        self.lines = iter(lines)
+        self.pending: Optional[str] = None
+        self.line_num = line_num
+
+    def source(self) -> Iterator[str]:
+        """Yield the lines that start a header, schema, comment or data row."""
+        for line in self.lines:
+            self.line_num += 1
+            yield line
+
+    def complete_row(self, line: str) -> str:
+        """Return line joined with the lines a multi-line quoted field continues on."""
+        line_num = self.line_num
+        # Escaped quotes come in pairs, so an odd count leaves a quoted field open
+        while line.count('"') % 2:
+            continuation = next(self.lines, None)
+            if continuation is None:
+                raise ValueError(f"Unterminated quoted field at line {line_num}")
+            self.line_num += 1
+            line += continuation
+        return line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        # csv.reader only ever gets the row it was handed; asking for more means
+        # a quote it took for an opening one was never closed
+        if self.pending is None:
+            raise StopIteration
+        row, self.pending = self.pending, None
+        return row
 
 
 class ThreeTLParser:
@@ -339,20 +534,250 @@ class ThreeTLParser:
     def __init__(self, grammar_file: Optional[Path] = None):
         """Initialize parser with grammar file."""
         self.grammar_file = grammar_file or GRAMMAR_FILE
+        # Content or (path, mtime, size) -> Document, least recently used first
+        self._cache: dict[Any, Document] = {}
         grammar_text = self.grammar_file.read_text(encoding='utf-8')
-        self.parser = Lark(grammar_text, parser='earley', ambiguity='resolve')
         self.transformer = ThreeTLTransformer()
+        # LALR applies the transformer while parsing, so no parse tree is built.
+        # Header and schema lines are parsed on their own through their own start rules.
+        self.parser = Lark(
+            grammar_text,
+            parser='lalr',
+            start=['table_header', 'schema_def'],
+            transformer=self.transformer,
+            cache=str(grammar_cache_file(self.grammar_file)),
+        )
 
     def parse_string(self, content: str) -> Document:
-        """Parse 3TL string into Document."""
-        tree = self.parser.parse(content)
-        document = self.transformer.transform(tree)
-        return document
+        """Parse 3TL string into Document.
+
+        Results are cached by content; every call returns its own copy.
+        """
+        document = self._cache_get(content)
+        if document is None:
+            document = Document(tables=list(self._iter_tables(io.StringIO(content))))
+            self._cache_put(content, document)
+        return _copy_document(document)
 
     def parse_file(self, filepath: str) -> Document:
-        """Parse 3TL file into Document."""
-        content = Path(filepath).read_text(encoding='utf-8')
-        return self.parse_string(content)
+        """Parse 3TL file into Document.
+
+        Results are cached until the file's mtime or size changes; every call returns its own copy.
+        """
+        st = os.stat(filepath)
+        key = (os.fspath(filepath), st.st_mtime_ns, st.st_size)
+
+        document = self._cache_get(key)
+        if document is None:
+            content = _read_text(filepath)
+            document = Document(tables=list(self._iter_tables(io.StringIO(content))))
+            self._cache_put(key, document)
+        return _copy_document(document)
+
+    def clear_cache(self):
+        """Forget all cached documents."""
+        self._cache.clear()
+
+    def _cache_get(self, key) -> Optional[Document]:
+        document = self._cache.pop(key, None)
+        if document is not None:
+            self._cache[key] = document  # Mark as most recently used
+        return document
+
+    def _cache_put(self, key, document: Document):
+        if len(self._cache) >= CACHE_SIZE:
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = document
+
+    def parse_file_parallel(self, filepath: str, workers: Optional[int] = None) -> Document:
+        """Parse 3TL file with its tables spread across worker processes.
+
+        Files under PARALLEL_MIN_BYTES, with a single table, or without a second CPU
+        are parsed serially, since starting workers would cost more than it saves.
+        """
+        workers = workers or os.cpu_count() or 1
+        content = _read_text(filepath)
+        blocks = _split_tables(content) if workers > 1 and len(content) >= PARALLEL_MIN_BYTES else []
+        if len(blocks) < 2:
+            return self.parse_string(content)
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self.grammar_file,)
+        ) as executor:
+            return Document(tables=[table for tables in executor.map(_parse_tables, blocks) for table in tables])
+
+    def parse_file_iter(self, filepath: str) -> Iterator[Table]:
+        """Parse 3TL file one table at a time, keeping only the current table in memory."""
+        with open(filepath, 'r', encoding='utf-8', buffering=1 << 20) as f:
+            yield from self._iter_tables(f)
+
+    def _iter_tables(self, lines: Iterator[str], line_num: int = 0) -> Iterator[Table]:
+        """Parse lines into tables, yielding each one once the next header (or the end) is reached.
+
+        line_num is the number of input lines before these, so errors name the line in the input.
+        """
+        feed = _LineFeed(lines, line_num)
+        reader = csv.reader(feed, strict=True, skipinitialspace=True)
+        table = None
+        rows = []
+
+        for line in feed.source():
+            if line.startswith('#!'):
+                if table:
+                    table.data = _convert_columns(table.columns, rows)
+                    yield table
+                table = _match_header(line) or self._parse_line(line, 'table_header', feed.line_num)
+                rows = []
+            elif line.startswith('#@'):
+                if table is None:
+                    raise ValueError(f"Schema before any table header at line {feed.line_num}")
+                table.columns = _match_schema(line) or self._parse_line(line, 'schema_def', feed.line_num)
+            elif line.startswith('#'):
+                continue  # Comment
+            elif not line.strip('\r\n'):
+                continue  # Blank line
+            else:
+                if table is None:
+                    raise ValueError(f"Data row before any table header at line {feed.line_num}")
+                if '"' in line:
+                    rows.append(_split_quoted_row(line, feed, reader))
+                else:
+                    rows.append(line.rstrip('\r\n').split(','))
+
+        if table:
+            table.data = _convert_columns(table.columns, rows)
+            yield table
+
+    def _parse_line(self, line: str, start: str, line_num: int):
+        """Parse a header or schema line on its own, reporting errors at its line in the input."""
+        try:
+            return self.parser.parse(_terminated(line), start=start)
+        except UnexpectedInput as e:
+            if isinstance(e.line, int) and e.line > 0:
+                e.line += line_num - 1
+            raise
+
+
+def _split_quoted_row(line: str, feed: _LineFeed, reader) -> list[str]:
+    """Split a data row holding quotes, reading on while a quoted field spans lines."""
+    line_num = feed.line_num
+    row = feed.complete_row(line)
+    feed.pending = row
+    try:
+        fields = next(reader)
+    except csv.Error:
+        fields = None
+    # csv.reader rejects whitespace after a closing quote, skips spaces but not tabs
+    # before an opening one and keeps quotes in unquoted fields; _split_row() follows
+    # the grammar for those rows
+    if fields is None or '\t' in row or any('"' in value for value in fields):
+        fields = _split_row(row, line_num)
+    return fields
+
+
+def _split_row(row: str, line_num: int) -> list[str]:
+    """Split a data row field by field as the grammar reads it, for rows csv.reader can't take as is."""
+    fields = []
+    pos = 0
+    while True:
+        match = _FIELD_RE.match(row, pos)
+        if match is None:
+            raise ValueError(f"Invalid data row at line {line_num}")
+        quoted, unquoted, separator = match.groups()
+        fields.append(unquoted if quoted is None else quoted.replace('""', '"'))
+        pos = match.end()
+        if separator != ',':
+            if pos != len(row):
+                raise ValueError(f"Invalid data row at line {line_num}")
+            return fields
+
+
+def _split_tables(content: str) -> list[tuple[int, str]]:
+    """Split content before each table header into (line number, block) pairs.
+
+    The first block also holds any leading comments.
+    """
+    blocks = []
+    block = []
+    first_line = 1
+    in_quotes = False
+
+    # Lines break at '\n' only, as in _iter_tables(); str.splitlines() also breaks at \u2028 and others
+    for line_num, line in enumerate(io.StringIO(content), 1):
+        # A header line starts the next table, unless it continues a multi-line quoted field
+        if not in_quotes and line.startswith('#!') and block:
+            blocks.append((first_line, ''.join(block)))
+            block = []
+            first_line = line_num
+        block.append(line)
+
+        if in_quotes or not line.startswith('#'):
+            # The same rule as _LineFeed.complete_row(): an odd count opens or closes a
+            # quoted field. Rows with quotes elsewhere are rejected wherever they end up.
+            in_quotes ^= line.count('"') % 2 == 1
+
+    if block:
+        blocks.append((first_line, ''.join(block)))
+    return blocks
+
+
+# Parser of the current worker process, see parse_file_parallel()
+_worker_parser = None
+
+
+def _init_worker(grammar_file: Path):
+    global _worker_parser
+    _worker_parser = ThreeTLParser(grammar_file)
+
+
+def _parse_tables(block: tuple[int, str]) -> list[Table]:
+    first_line, content = block
+    try:
+        return list(_worker_parser._iter_tables(io.StringIO(content), first_line - 1))
+    except UnexpectedInput as e:
+        # Lark's errors hold the parser state, which can't be pickled back to the parent
+        raise ValueError(str(e)) from None
+
+
+def _copy_document(document: Document) -> Document:
+    """Copy a document's tables, columns and column lists; the values themselves are immutable."""
+    return Document(tables=[
+        Table(
+            name=table.name,
+            columns=[
+                Column(name=col.name, type=replace(col.type, params=deepcopy(col.type.params)))
+                for col in table.columns
+            ],
+            data=[list(values) for values in table.data],
+        )
+        for table in document.tables
+    ])
+
+
+def _read_text(filepath) -> str:
+    """Read a UTF-8 file with universal newlines, like Path.read_text() but decoded in one pass."""
+    # A bulk decode is ~3x faster than Path.read_text()'s incremental text-mode decoding
+    content = Path(filepath).read_bytes().decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def _terminated(line: str) -> str:
+    """Return line with the line break the grammar expects, which the last line may lack."""
+    return line if line.endswith('\n') else line + '\n'
+
+
+# Cache the parser instance
+_parser = None
+
+
+def get_parser() -> ThreeTLParser:
+    """Get or create the shared ThreeTLParser instance."""
+    global _parser
+    if _parser is None:
+        _parser = ThreeTLParser()
+    return _parser
 
 
 def main():
@@ -376,18 +801,19 @@ def main():
     args = parser.parse_args()
 
     try:
-        three_tl_parser = ThreeTLParser()
-        document = three_tl_parser.parse_file(args.file)
+        document = get_parser().parse_file(args.file)
 
-        # Convert to JSON
+        # Convert to JSON, streamed one table at a time
         indent = 2 if args.pretty else None
-        json_output = document.to_json(indent=indent)
 
         if args.output:
-            Path(args.output).write_text(json_output, encoding='utf-8')
+            with open(args.output, 'wb') as f:
+                document.write_json(f, indent=indent)
             print(f"Parsed {args.file} -> {args.output}")
         else:
-            print(json_output)
+            sys.stdout.flush()
+            document.write_json(sys.stdout.buffer, indent=indent)
+            sys.stdout.buffer.write(b'\n')
 
         sys.exit(0)
 
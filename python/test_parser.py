@@ -3,9 +3,28 @@
 Tests for the 3TL parser.
 """
 
+import argparse
+import contextlib
+import io
+import json
+import os
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from pathlib import Path
 from parser import ThreeTLParser, TypeInfo, Column, Table, Document
 
+# Building a parser loads the grammar, so every test shares one; its document cache
+# only ever hands out copies, so tests can't see each other's changes
+_PARSER = ThreeTLParser()
+
+# Small one-table document used by more than one test
+USER_CONTENT = """#! User
+#@ id:uint, name:str
+1, Alice
+"""
+
 
 def test_basic_table():
     """Test parsing a basic table."""
@@ -15,7 +34,7 @@ def test_basic_table():
 2, Bob, bob@example.com
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     assert len(doc.tables) == 1, f"Expected 1 table, got {len(doc.tables)}"
@@ -26,16 +45,14 @@ def test_basic_table():
     assert len(table.rows) == 2, f"Expected 2 rows, got {len(table.rows)}"
 
     # Check columns
-    assert table.columns[0].name == "id"
-    assert table.columns[0].type.base_type == "uint"
-    assert table.columns[1].name == "name"
-    assert table.columns[1].type.base_type == "str"
+    columns = [(col.name, col.type.base_type) for col in table.columns]
+    assert columns == [("id", "uint"), ("name", "str"), ("email", "str")], f"Got {columns}"
 
     # Check data
-    assert table.rows[0][0] == 1
-    assert table.rows[0][1] == "Alice"
-    assert table.rows[1][0] == 2
-    assert table.rows[1][1] == "Bob"
+    assert table.rows == [
+        [1, "Alice", "alice@example.com"],
+        [2, "Bob", "bob@example.com"],
+    ], f"Got {table.rows}"
 
     print("✓ test_basic_table passed")
 
@@ -48,7 +65,7 @@ def test_nullable_type():
 2, World,
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
@@ -65,7 +82,7 @@ def test_array_type():
 1, tag1
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
@@ -81,7 +98,7 @@ def test_decimal_type():
 1, 19.99
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
@@ -89,6 +106,9 @@ def test_decimal_type():
     assert decimal_col.type.base_type == "decimal"
     assert decimal_col.type.params['precision'] == 10
     assert decimal_col.type.params['scale'] == 2
+    assert table.rows[0][1] == Decimal("19.99"), f"Expected exact Decimal, got {table.rows[0][1]!r}"
+    assert '[1,19.99]' in doc.to_json(indent=None), "Expected decimal written as a JSON number"
+    assert json.loads(doc.to_json(indent=4), parse_float=Decimal)["tables"][0]["rows"][0][1] == Decimal("19.99")
 
     print("✓ test_decimal_type passed")
 
@@ -100,7 +120,7 @@ def test_ref_type():
 1, 42
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
@@ -119,15 +139,13 @@ def test_enum_type():
 1, pending
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
     enum_col = table.columns[1]
     assert enum_col.type.base_type == "enum"
-    assert "pending" in enum_col.type.params['values']
-    assert "in_progress" in enum_col.type.params['values']
-    assert "completed" in enum_col.type.params['values']
+    assert enum_col.type.params['values'] == ["pending", "in_progress", "completed"], f"Got {enum_col.type.params}"
 
     print("✓ test_enum_type passed")
 
@@ -143,13 +161,13 @@ def test_multiple_tables():
 1, 1, My First Post
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     assert len(doc.tables) == 2, f"Expected 2 tables, got {len(doc.tables)}"
-    assert doc.tables[0].name == "User"
-    assert doc.tables[1].name == "Post"
-    assert len(doc.tables[1].columns) == 3
+    assert [table.name for table in doc.tables] == ["User", "Post"]
+    assert [col.name for col in doc.tables[1].columns] == ["id", "user_id", "title"]
+    assert [table.rows for table in doc.tables] == [[[1, "Alice"]], [[1, 1, "My First Post"]]]
 
     print("✓ test_multiple_tables passed")
 
@@ -164,11 +182,11 @@ def test_comments():
 1, Alice
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     assert len(doc.tables) == 1
-    assert len(doc.tables[0].rows) == 1
+    assert doc.tables[0].rows == [[1, "Alice"]], f"Got {doc.tables[0].rows}"
 
     print("✓ test_comments passed")
 
@@ -179,15 +197,18 @@ def test_quoted_fields():
 #@ id:uint, title:str, content:str
 1, "Hello, World", "This is a test"
 2, Normal, "With ""quotes"" inside"
+3,\t"Tab, before" , "Space after"\t
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
-    assert table.rows[0][1] == "Hello, World"
-    assert table.rows[0][2] == "This is a test"
-    assert table.rows[1][2] == 'With "quotes" inside'
+    assert table.rows == [
+        [1, "Hello, World", "This is a test"],
+        [2, "Normal", 'With "quotes" inside'],
+        [3, "Tab, before", "Space after"],
+    ], f"Got {table.rows}"
 
     print("✓ test_quoted_fields passed")
 
@@ -199,17 +220,33 @@ def test_case_insensitive_types():
 1, Alice, true
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
-    assert table.columns[0].type.base_type == "uint"
-    assert table.columns[1].type.base_type == "str"
-    assert table.columns[2].type.base_type == "bool"
+    assert [col.type.base_type for col in table.columns] == ["uint", "str", "bool"]
 
     print("✓ test_case_insensitive_types passed")
 
 
+def test_case_insensitive_parameterized_types():
+    """Test upper-case keywords and whitespace in decimal, ref and enum types."""
+    content = """#! Test
+#@ price:DECIMAL( 8 , 3 ), user_id:REF(User.id), status:Enum( open | closed )
+1.5, 1, open
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    price, user_id, status = (col.type for col in doc.tables[0].columns)
+    assert price.params == {'precision': 8, 'scale': 3}, f"Got {price.params}"
+    assert user_id.params == {'table': 'User', 'column': 'id'}, f"Got {user_id.params}"
+    assert status.params == {'values': ['open', 'closed']}, f"Got {status.params}"
+
+    print("✓ test_case_insensitive_parameterized_types passed")
+
+
 def test_unicode_identifiers():
     """Test Unicode in identifiers and data."""
     content = """#! Café
@@ -217,25 +254,22 @@ def test_unicode_identifiers():
 1, José
 """
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     table = doc.tables[0]
     assert table.name == "Café"
-    assert table.columns[1].name == "nombre"
-    assert table.rows[0][1] == "José"
+    assert [col.name for col in table.columns] == ["id", "nombre"]
+    assert table.rows == [[1, "José"]], f"Got {table.rows}"
 
     print("✓ test_unicode_identifiers passed")
 
 
 def test_to_json():
     """Test JSON serialization."""
-    content = """#! User
-#@ id:uint, name:str
-1, Alice
-"""
+    content = USER_CONTENT
 
-    parser = ThreeTLParser()
+    parser = _PARSER
     doc = parser.parse_string(content)
 
     json_str = doc.to_json()
@@ -246,8 +280,333 @@ def test_to_json():
     print("✓ test_to_json passed")
 
 
-def run_all_tests():
-    """Run all tests."""
+def test_row_width():
+    """Test that rows hold exactly one value per field."""
+    content = """#! Article
+#@ id:uint, title:str, content:str?
+1, Hello, This is content
+2, World,
+, Untitled,
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    table = doc.tables[0]
+    assert all(len(row) == 3 for row in table.rows), f"Expected 3 values per row, got {table.rows}"
+    assert table.rows[2][0] is None, "Expected None for leading empty field"
+
+    print("✓ test_row_width passed")
+
+
+def test_blank_lines():
+    """Test that blank lines are skipped, inside and between tables."""
+    content = """
+#! User
+#@ id:uint, name:str
+
+1, Alice
+
+2, Bob
+
+
+#! Post
+#@ id:uint, title:str
+1, Hello
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    assert len(doc.tables) == 2, f"Expected 2 tables, got {len(doc.tables)}"
+    assert doc.tables[0].rows == [[1, "Alice"], [2, "Bob"]], f"Got {doc.tables[0].rows}"
+    assert doc.tables[1].rows == [[1, "Hello"]], f"Got {doc.tables[1].rows}"
+
+    print("✓ test_blank_lines passed")
+
+
+def test_value_conversion():
+    """Test conversion of unquoted field values."""
+    content = """#! Test
+#@ a:int, b:float, c:float, d:bool, e:str?, f:str, g:str
+-3, 1.5, 1e3, FALSE, null, nan, 12abc
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    row = doc.tables[0].rows[0]
+    assert row == [-3, 1.5, 1000.0, False, None, "nan", "12abc"], f"Got {row}"
+
+    print("✓ test_value_conversion passed")
+
+
+def test_schema_typed_values():
+    """Test that values are converted by their column type."""
+    content = """#! Test
+#@ id:uint, code:str, active:bool, score:f64, created:date
+1, 007, yes, 3, 2024-01-15
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    row = doc.tables[0].rows[0]
+    assert row == [1, "007", "yes", 3.0, "2024-01-15"], f"Got {row}"
+    assert isinstance(row[3], float), "Expected float for f64 column"
+
+    print("✓ test_schema_typed_values passed")
+
+
+def test_column_data():
+    """Test column-wise access and padding of short rows."""
+    content = """#! Product
+#@ id:uint, name:str, price:f64?
+1, Mouse, 29.99
+2, Hub
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    table = doc.tables[0]
+    assert table.column("id") == [1, 2]
+    assert table.column("price") == [29.99, None], "Expected short row padded with None"
+    assert table.rows == [[1, "Mouse", 29.99], [2, "Hub", None]], f"Got {table.rows}"
+
+    table.append_row([3, "Cable"])
+    assert table.rows[2] == [3, "Cable", None]
+
+    table.rows = [[4, "Dock", 99.0]]
+    assert table.data == [[4], ["Dock"], [99.0]], f"Got {table.data}"
+
+    # Rows given positionally, as before the data was stored by column
+    table = Table("Product", table.columns, [[1, "Mouse"], [2, "Hub", 5.0]])
+    assert table.column("name") == ["Mouse", "Hub"]
+    assert table.rows == [[1, "Mouse", None], [2, "Hub", 5.0]], f"Got {table.rows}"
+
+    print("✓ test_column_data passed")
+
+
+def test_parse_file_iter():
+    """Test streaming a file table by table."""
+    content = """# Header comment
+#! User
+#@ id:uint, bio:text
+1, "Line one
+#! not a table
+line three"
+
+#! Post
+#@ id:uint, title:str
+1, Hello
+"""
+
+    parser = _PARSER
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.3tl"
+        path.write_text(content, encoding="utf-8")
+        tables = list(parser.parse_file_iter(path))
+        expected = parser.parse_file(path).tables
+
+    assert [t.name for t in tables] == ["User", "Post"], f"Got {[t.name for t in tables]}"
+    assert tables[0].rows[0][1] == "Line one\n#! not a table\nline three"
+    assert [t.to_dict() for t in tables] == [t.to_dict() for t in expected]
+
+    print("✓ test_parse_file_iter passed")
+
+
+def test_parse_file_line_endings():
+    """Test that files with CRLF or CR line endings parse like LF files."""
+    content = """#! User
+#@ id:uint, bio:text
+1, "Line one
+line two"
+2, Bob
+"""
+
+    parser = _PARSER
+    expected = parser.parse_string(content).to_dict()
+    with tempfile.TemporaryDirectory() as tmp:
+        for newline in ("\r\n", "\r"):
+            path = Path(tmp) / "data.3tl"
+            path.write_bytes(content.replace("\n", newline).encode("utf-8"))
+            assert parser.parse_file(path).to_dict() == expected, f"Mismatch with {newline!r} line endings"
+
+    print("✓ test_parse_file_line_endings passed")
+
+
+def test_parse_file_parallel():
+    """Test that parsing tables in worker processes matches a serial parse."""
+    rows = "".join(f'{i}, "Name, {i}", {i * 0.5}\n' for i in range(2000))
+    content = "# Header comment\n" + "".join(
+        f"#! Table{n}\n#@ id:uint, name:str, score:f64\n{rows}\n" for n in range(3)
+    )
+
+    parser = _PARSER
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.3tl"
+        path.write_text(content, encoding="utf-8")
+        doc = parser.parse_file_parallel(path, workers=2)
+        expected = parser.parse_file(path)
+
+    assert [t.name for t in doc.tables] == ["Table0", "Table1", "Table2"]
+    assert doc.to_dict() == expected.to_dict()
+
+    # A quote inside an unquoted field must not hide a header from the split into workers,
+    # and the error must name the same line either way
+    content = f"#! A\n#@ id:uint, name:str\n{rows}1, 12\" ruler, \"multi\n#! Fake\nend\"\n#! B\n{rows}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.3tl"
+        path.write_text(content, encoding="utf-8")
+        errors = []
+        for parse in (parser.parse_file, lambda p: parser.parse_file_parallel(p, workers=2)):
+            try:
+                parse(path)
+            except ValueError as e:
+                errors.append(str(e))
+    assert errors == ["Invalid data row at line 2003"] * 2, f"Got {errors}"
+
+    # Header and schema errors come back from workers with the serial parse's message
+    content = f"#! A\n#@ id:uint, name:str\n{rows}#! B\n#@ id:: uint\n{rows}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.3tl"
+        path.write_text(content, encoding="utf-8")
+        errors = []
+        for parse in (parser.parse_file, lambda p: parser.parse_file_parallel(p, workers=2)):
+            try:
+                parse(path)
+            except Exception as e:
+                errors.append(str(e))
+    # Only the first line is compared: the expected terminals that follow come from a set
+    first_lines = [error.splitlines()[0] for error in errors]
+    assert first_lines == ["Unexpected token Token('COLON', ':') at line 2004, column 7."] * 2, f"Got {errors}"
+
+    print("✓ test_parse_file_parallel passed")
+
+
+def test_parse_cache():
+    """Test that repeated parses are cached but return independent documents."""
+    content = USER_CONTENT
+
+    parser = _PARSER
+    first = parser.parse_string(content)
+    first.tables[0].append_row([2, "Bob"])
+    first.tables[0].columns[1].name = "renamed"
+
+    second = parser.parse_string(content)
+    assert second.tables[0].rows == [[1, "Alice"]], f"Cached document was modified: {second.tables[0].rows}"
+    assert second.tables[0].columns[1].name == "name"
+
+    parser.clear_cache()
+    assert parser.parse_string(content).to_dict() == second.to_dict()
+
+    print("✓ test_parse_cache passed")
+
+
+def test_to_json_round_trip():
+    """Test that JSON output matches to_dict, compact or indented."""
+    content = """#! Café
+#@ id:uint, nombre:str, big:int
+1, José, 123456789012345678901234567890
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    for indent in (None, 2, 4):
+        assert json.loads(doc.to_json(indent=indent)) == doc.to_dict(), f"Mismatch with indent={indent}"
+
+    print("✓ test_to_json_round_trip passed")
+
+
+def test_write_json():
+    """Test streaming JSON output to a file, one table at a time."""
+    content = """#! User
+#@ id:uint, name:str
+1, Alice
+2, Bob
+
+#! Post
+#@ id:uint, price:decimal(10,2)
+1, 19.99
+"""
+
+    parser = _PARSER
+    doc = parser.parse_string(content)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.json"
+        for indent in (None, 2):
+            with open(path, 'wb') as f:
+                doc.write_json(f, indent=indent)
+            assert path.read_text(encoding='utf-8') == doc.to_json(indent=indent)
+            assert json.loads(path.read_text(encoding='utf-8'), parse_float=Decimal) == doc.to_dict()
+
+    assert json.loads(Document(tables=[]).to_json()) == {'tables': []}
+
+    print("✓ test_write_json passed")
+
+
+def test_header_schema_fast_path():
+    """Test that header and schema lines parse the same with or without the regex fast path."""
+    parser = _PARSER
+    headers = ["#! Product\n", "#!Café \n"]
+    schemas = [
+        "#@ id:uint, price : decimal( 10 , 2 ), tags:str[]?, note:TEXT?\n",
+        "#@ id:uint, status:enum(active|inactive), user:ref(User.id)\n",
+        "#@ nombre:str, año:i32\n",
+    ]
+
+    for header in headers:
+        for schema in schemas:
+            table = parser.parse_string(header + schema).tables[0]
+            assert table.name == parser.parser.parse(header, start='table_header').name
+            assert table.columns == parser.parser.parse(schema, start='schema_def')
+
+    print("✓ test_header_schema_fast_path passed")
+
+
+def test_parse_errors():
+    """Test that malformed rows, headers and schemas raise and name their line."""
+    parser = _PARSER
+    cases = {
+        # An unterminated quote must not swallow the tables after it
+        '#! A\n#@ id:int, name:str\n1, "abc\n2, x\n#! B\n#@ id:int\n1\n': "line 3",
+        '#! A\n#@ id:int, name:str\n1, 12" ruler, "x"\n': "line 3",
+        '#! A\n#@ id:int, name:str\n1, "x" y\n': "line 3",
+        '#! A\n#@ id:int\n# comment\n\n1\n#@ id:: int\n': "line 6",
+        '#! A\n#@ id:int\n1\n#! 2B\n': "line 4",
+    }
+
+    for content, line in cases.items():
+        try:
+            parser.parse_string(content)
+        except Exception as e:
+            assert line in str(e), f"Expected {line} for {content!r}, got {e}"
+        else:
+            assert False, f"Expected an error for {content!r}"
+
+    print("✓ test_parse_errors passed")
+
+
+def _run_test(name):
+    """Run one test by name, returning its printed output and whether it passed."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            globals()[name]()
+        except AssertionError as e:
+            print(f"✗ {name} failed: {e}")
+            return output.getvalue(), False
+        except Exception as e:
+            print(f"✗ {name} error: {e}")
+            return output.getvalue(), False
+    return output.getvalue(), True
+
+
+def run_all_tests(jobs=1):
+    """Run all tests, spread across jobs worker processes if more than one."""
     tests = [
         test_basic_table,
         test_nullable_type,
@@ -259,32 +618,59 @@ def run_all_tests():
         test_comments,
         test_quoted_fields,
         test_case_insensitive_types,
+        test_case_insensitive_parameterized_types,
         test_unicode_identifiers,
         test_to_json,
+        test_row_width,
+        test_blank_lines,
+        test_value_conversion,
+        test_schema_typed_values,
+        test_column_data,
+        test_parse_file_iter,
+        test_parse_file_line_endings,
+        test_parse_file_parallel,
+        test_parse_cache,
+        test_to_json_round_trip,
+        test_write_json,
+        test_header_schema_fast_path,
+        test_parse_errors,
     ]
 
+    names = [test.__name__ for test in tests]
+
     failed = []
 
-    for test in tests:
-        try:
-            test()
-        except AssertionError as e:
-            print(f"✗ {test.__name__} failed: {e}")
-            failed.append(test.__name__)
-        except Exception as e:
-            print(f"✗ {test.__name__} error: {e}")
-            failed.append(test.__name__)
+    # Tests are independent, so they can run in any process; output is printed in order
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_run_test, names))
+    else:
+        results = map(_run_test, names)
 
-    print(f"\n{'='*60}")
+    for name, (output, passed) in zip(names, results):
+        sys.stdout.write(output)
+        if not passed:
+            failed.append(name)
+
+    summary = [f"\n{'='*60}"]
     if failed:
-        print(f"FAILED: {len(failed)} test(s) failed")
-        for name in failed:
-            print(f"  - {name}")
-        sys.exit(1)
+        summary.append(f"FAILED: {len(failed)} test(s) failed")
+        summary.extend(f"  - {name}" for name in failed)
     else:
-        print(f"SUCCESS: All {len(tests)} tests passed!")
-        sys.exit(0)
+        summary.append(f"SUCCESS: All {len(tests)} tests passed!")
+
+    sys.stdout.write("\n".join(summary) + "\n")
+    sys.stdout.flush()
+    sys.exit(1 if failed else 0)
 
 
 if __name__ == '__main__':
-    run_all_tests()
+    arg_parser = argparse.ArgumentParser(description='Run the 3TL parser tests')
+    arg_parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Number of worker processes, 0 for one per CPU (default: 1)'
+    )
+    args = arg_parser.parse_args()
+    run_all_tests(args.jobs or os.cpu_count() or 1)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Tests for the 3TL validator.
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import validator
+from validator import validate_file, validate_string, get_parser, get_check_parser, _get_line, _read_file
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+# Lines documents are built from, valid and invalid, for comparing the two parsers
+PIECES = [
+    "#! User\n", "#! Café\n", "#!User\n", "#! 1User\n",
+    "#@ id:uint, name:str\n", "#@ price:decimal(10,2), tags:str[]?\n",
+    "#@ status:enum(active|inactive), user:ref(User.id)\n", "#@ id uint\n",
+    "# comment\n", "#\n", "\n",
+    "1, Alice\n", '2, "Bob, Jr."\n', '3,\t"tab" , x\n', '4, "multi\nline"\n', '5, "open\n', "1,,\n",
+]
+
+
+def test_valid_examples():
+    """Test that every example file validates."""
+    for path in sorted(EXAMPLES_DIR.glob("*.3tl")):
+        is_valid, error = validate_file(str(path))
+        assert is_valid, f"{path.name}: {error}"
+
+    print("✓ test_valid_examples passed")
+
+
+def test_check_parser_agreement():
+    """Test that the tree-building and check-only parsers accept and reject the same input."""
+    rng = random.Random(0)
+    documents = ["".join(rng.choice(PIECES) for _ in range(rng.randint(1, 6))) for _ in range(500)]
+    documents += [path.read_text(encoding="utf-8") for path in EXAMPLES_DIR.glob("*.3tl")]
+
+    tree_parser, check_parser = get_parser(), get_check_parser()
+    for content in documents:
+        outcomes = []
+        for parser in (tree_parser, check_parser):
+            try:
+                parser.parse(content)
+                outcomes.append(True)
+            except Exception as e:
+                outcomes.append(type(e).__name__)
+        assert outcomes[0] == outcomes[1], f"Parsers disagree on {content!r}: {outcomes}"
+        assert validate_string(content) == validate_string(content, build_tree=True), f"Got different errors for {content!r}"
+
+    assert check_parser.parse("#! User\n#@ id:uint\n1\n") is None, "Expected the check parser to build no tree"
+
+    print("✓ test_check_parser_agreement passed")
+
+
+def test_error_messages():
+    """Test the error messages for malformed input."""
+    cases = {
+        "#! User\n#@ id uint\n": "Parse error at line 2, column 7\n  #@ id uint\n        ^\nExpected: {'COLON'}",
+        "#! 1User\n": "Parse error at line 1, column 4\n  #! 1User\n     ^\nExpected: {'IDENTIFIER'}",
+    }
+    for content, expected in cases.items():
+        assert validate_string(content) == (False, expected), f"Got {validate_string(content)}"
+
+    # The expected terminals are a set, so only their names are pinned, not their order
+    is_valid, error = validate_string("#@ id:uint")
+    head, expected = error.rsplit("\n", 1)
+    assert not is_valid
+    assert head == "Parse error at line 1, column 1\n  #@ id:uint\n  ^", f"Got {head!r}"
+    assert expected.startswith("Expected: ") and "'_COMMENT_START'" in expected, f"Got {expected!r}"
+
+    assert validate_string("#! User\n#@ id:uint\n1, Alice\n") == (True, "")
+
+    print("✓ test_error_messages passed")
+
+
+def test_get_line():
+    """Test finding the line around an error offset."""
+    content = "first\nsecond\nthird"
+    assert _get_line(content, 0) == "first"
+    assert _get_line(content, 5) == "first", "Expected the offset of a line break to belong to its line"
+    assert _get_line(content, 6) == "second"
+    assert _get_line(content, len(content)) == "third"
+    assert _get_line(content, None) is None
+    assert _get_line(content, -1) is None, "Expected no line for UnexpectedEOF's position"
+    assert _get_line(content, len(content) + 1) is None
+
+    print("✓ test_get_line passed")
+
+
+def test_read_file():
+    """Test that small and memory-mapped files read the same, with line endings normalized."""
+    content = "#! Café\r\n#@ id:uint\r\n1\r2\n"
+    threshold = validator.MMAP_THRESHOLD
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.3tl"
+        path.write_bytes(content.encode("utf-8"))
+        try:
+            for validator.MMAP_THRESHOLD in (threshold, 1):
+                text = _read_file(path)
+                assert text == "#! Café\n#@ id:uint\n1\n2\n", f"Got {text!r} with threshold {validator.MMAP_THRESHOLD}"
+        finally:
+            validator.MMAP_THRESHOLD = threshold
+
+        assert validate_file(str(path)) == (True, "")
+        assert validate_file(str(Path(tmp) / "missing.3tl"))[1].startswith("File not found")
+
+    print("✓ test_read_file passed")
+
+
+def test_grammar_reload():
+    """Test that a grammar is read once, then again only after its file changes."""
+    grammar_file = validator.GRAMMAR_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / "3tl-grammar.lark"
+        shutil.copyfile(grammar_file, copy)
+        try:
+            validator.GRAMMAR_FILE = copy
+            text, digest = validator._read_grammar()
+            assert validator._read_grammar()[1] == digest
+
+            copy.write_text(text + "\n// changed\n", encoding="utf-8")
+            st = copy.stat()
+            os.utime(copy, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            assert validator._read_grammar()[1] != digest, "Expected the changed grammar to be read again"
+            assert validate_string("#! User\n#@ id:uint\n1\n") == (True, "")
+        finally:
+            validator.GRAMMAR_FILE = grammar_file
+
+    print("✓ test_grammar_reload passed")
+
+
+def test_show_tree():
+    """Test that --show-tree reads the input once and prints the tree built while validating."""
+    reads = []
+
+    def read_file(path):
+        reads.append(path)
+        return read(path)
+
+    read = validator._read_file
+    argv = sys.argv
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.3tl"
+        path.write_text("#! User\n#@ id:uint\n1\n", encoding="utf-8")
+        try:
+            validator._read_file = read_file
+            for args in (["--show-tree", str(path)], ["-s", "#! 1User\n"]):
+                sys.argv = ["validator.py", *args]
+                try:
+                    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                        validator.main()
+                except SystemExit as e:
+                    code = e.code
+                if args[0] == "--show-tree":
+                    assert code == 0, f"Expected exit code 0, got {code}"
+                else:
+                    assert code == 1, f"Expected exit code 1, got {code}"
+        finally:
+            validator._read_file = read
+            sys.argv = argv
+
+    assert len(reads) == 1, f"Expected one read, got {len(reads)}"
+    output = stdout.getvalue()
+    assert output.startswith("Valid 3TL format\n\nParse tree:\n"), f"Got {output!r}"
+    assert "table_header" in output and "schema_def" in output, f"Got {output!r}"
+    assert stderr.getvalue().startswith("Invalid: Parse error at line 1, column 4"), f"Got {stderr.getvalue()!r}"
+
+    print("✓ test_show_tree passed")
+
+
+def run_all_tests():
+    """Run all tests."""
+    tests = [
+        test_valid_examples,
+        test_check_parser_agreement,
+        test_error_messages,
+        test_get_line,
+        test_read_file,
+        test_grammar_reload,
+        test_show_tree,
+    ]
+
+    failed = []
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            print(f"✗ {test.__name__} failed: {e}")
+            failed.append(test.__name__)
+        except Exception as e:
+            print(f"✗ {test.__name__} error: {e}")
+            failed.append(test.__name__)
+
+    summary = [f"\n{'='*60}"]
+    if failed:
+        summary.append(f"FAILED: {len(failed)} test(s) failed")
+        summary.extend(f"  - {name}" for name in failed)
+    else:
+        summary.append(f"SUCCESS: All {len(tests)} tests passed!")
+
+    sys.stdout.write("\n".join(summary) + "\n")
+    sys.stdout.flush()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -7,105 +7,228 @@ Usage:
     python validator.py --string "3TL content"
 """
 
+import hashlib
+import mmap
+import os
 import sys
-import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
-from lark import Lark, LarkError, UnexpectedInput, UnexpectedCharacters
+# Lark and argparse are imported where they're used, so importing this module
+# for validate_string() stays cheap until the first parse
+if TYPE_CHECKING:
+    from lark import Lark
 
 
 # Get the grammar file path relative to this script
 GRAMMAR_FILE = Path(__file__).parent.parent / "3tl-grammar.lark"
 
-# Cache the parser instance
-_parser = None
+# Smallest file _read_file() memory-maps
+MMAP_THRESHOLD = 1 << 20
 
+# Built parsers keyed by (grammar digest, kind), so switching grammars doesn't rebuild them.
+# Each grammar gets a 'tree' parser building parse trees and a 'check' parser only checking input
+_parser_cache: dict[tuple[str, str], 'Lark'] = {}
 
-def get_parser() -> Lark:
-    """Get or create the Lark parser instance."""
-    global _parser
-    if _parser is None:
+# ((path, mtime, size), text, digest) of the grammar last read, see _read_grammar()
+_grammar: Optional[tuple[Any, str, str]] = None
+
+
+def grammar_cache_file(grammar_file: Path) -> Path:
+    """Return where the compiled LALR tables for the validator are cached.
+
+    Kept apart from the parser's cache, which is built with different options.
+    Lark rebuilds the file when the grammar or options change.
+    """
+    return grammar_file.with_suffix('.validator.lark.cache')
+
+
+def _read_grammar() -> tuple[str, str]:
+    """Return GRAMMAR_FILE's text and a digest of it, reading the file again only once it changes."""
+    global _grammar
+    st = os.stat(GRAMMAR_FILE)
+    key = (GRAMMAR_FILE, st.st_mtime_ns, st.st_size)
+    if _grammar is None or _grammar[0] != key:
         grammar_text = GRAMMAR_FILE.read_text(encoding='utf-8')
-        # Use earley parser - resolve ambiguities automatically
-        _parser = Lark(grammar_text, parser='earley', ambiguity='resolve')
-    return _parser
+        digest = hashlib.blake2b(grammar_text.encode('utf-8'), digest_size=16).hexdigest()
+        _grammar = (key, grammar_text, digest)
+    return _grammar[1], _grammar[2]
+
+
+def _build_parser(grammar_text: str, **options) -> 'Lark':
+    """Build a Lark parser for grammar_text, read from GRAMMAR_FILE."""
+    from lark import Lark
+
+    try:
+        import lark_cython
+    except ImportError:  # Fall back to Lark's pure-Python LALR parser
+        lark_cython = None
+
+    # The grammar is LALR(1), so the deterministic table-driven parser applies
+    # lark_cython runs the parse loop and builds tokens in C when installed
+    plugins = lark_cython.plugins if lark_cython else {}
+    return Lark(
+        grammar_text,
+        parser='lalr',
+        cache=str(grammar_cache_file(GRAMMAR_FILE)),
+        _plugins=plugins,
+        **options,
+    )
 
 
-def validate_string(content: str) -> tuple[bool, str]:
+def get_parser() -> 'Lark':
+    """Get or create the Lark parser instance for the current grammar."""
+    grammar_text, digest = _read_grammar()
+    parser = _parser_cache.get((digest, 'tree'))
+    if parser is None:
+        parser = _parser_cache[digest, 'tree'] = _build_parser(grammar_text)
+    return parser
+
+
+def _discard(self, children):
+    return None
+
+
+def get_check_parser() -> 'Lark':
+    """Get or create a parser that accepts or rejects input without building a parse tree."""
+    grammar_text, digest = _read_grammar()
+    parser = _parser_cache.get((digest, 'check'))
+    if parser is None:
+        from lark import Transformer
+
+        # Named rules return None instead of a Tree; inlined rules (leading '_')
+        # still build theirs, since Lark unpacks them into their parent's children.
+        # Transformers are left out of Lark's cache key, so the cached tables are shared
+        names = {str(rule.origin.name) for rule in get_parser().rules if not rule.origin.name.startswith('_')}
+        discard = type('Discard', (Transformer,), dict.fromkeys(names, _discard))
+        parser = _parser_cache[digest, 'check'] = _build_parser(grammar_text, transformer=discard())
+    return parser
+
+
+def _get_line(content: str, pos: Optional[int]) -> Optional[str]:
+    """Return the line of content around offset pos, or None if pos is not in content."""
+    if pos is None or not 0 <= pos <= len(content):
+        return None
+    # Search out from the error for the line's ends instead of splitting the whole input
+    start = content.rfind('\n', 0, pos) + 1
+    end = content.find('\n', pos)
+    return content[start:end] if end != -1 else content[start:]
+
+
+def validate_string(content: str, build_tree: bool = False) -> tuple[bool, str]:
     """
     Validate a 3TL string.
 
+    The parse tree is only built if build_tree is set; validation alone doesn't need it.
+
     Returns:
         Tuple of (is_valid, error_message)
     """
+    is_valid, error_msg, _ = _validate(content, build_tree)
+    return is_valid, error_msg
+
+
+def _validate(content: str, build_tree: bool) -> tuple[bool, str, Any]:
+    """Validate a 3TL string, also returning its parse tree (None unless built and valid)."""
+    from lark import LarkError, UnexpectedInput, UnexpectedCharacters
+
     try:
-        parser = get_parser()
+        parser = get_parser() if build_tree else get_check_parser()
         tree = parser.parse(content)
-        return True, ""
+        return True, "", tree
 
     except UnexpectedCharacters as e:
         # Calculate line and column
-        lines = content.split('\n')
         line_num = e.line
         col_num = e.column
 
         # Get the problematic line
-        if 0 <= line_num - 1 < len(lines):
-            problem_line = lines[line_num - 1]
+        problem_line = _get_line(content, e.pos_in_stream)
+        if problem_line is not None:
             # Show the error with context
-            error_msg = f"Unexpected character at line {line_num}, column {col_num}\n"
-            error_msg += f"  {problem_line}\n"
-            error_msg += f"  {' ' * (col_num - 1)}^\n"
-            error_msg += f"Expected: {e.allowed}"
+            error_msg = "\n".join([
+                f"Unexpected character at line {line_num}, column {col_num}",
+                f"  {problem_line}",
+                f"  {' ' * (col_num - 1)}^",
+                f"Expected: {e.allowed}",
+            ])
         else:
             error_msg = f"Unexpected character at line {line_num}: {e}"
 
-        return False, error_msg
+        return False, error_msg, None
 
     except UnexpectedInput as e:
-        lines = content.split('\n')
         line_num = e.line
         col_num = e.column
 
-        if 0 <= line_num - 1 < len(lines):
-            problem_line = lines[line_num - 1]
-            error_msg = f"Parse error at line {line_num}, column {col_num}\n"
-            error_msg += f"  {problem_line}\n"
-            error_msg += f"  {' ' * (col_num - 1)}^\n"
-            if hasattr(e, 'expected'):
-                error_msg += f"Expected: {e.expected}"
+        problem_line = _get_line(content, e.pos_in_stream)
+        if problem_line is not None:
+            expected = getattr(e, 'expected', None)
+            error_msg = "\n".join([
+                f"Parse error at line {line_num}, column {col_num}",
+                f"  {problem_line}",
+                f"  {' ' * (col_num - 1)}^",
+                f"Expected: {expected}" if expected is not None else "",
+            ])
         else:
             error_msg = f"Parse error at line {line_num}: {e}"
 
-        return False, error_msg
+        return False, error_msg, None
 
     except LarkError as e:
-        return False, f"Parse error: {e}"
+        return False, f"Parse error: {e}", None
 
     except Exception as e:
-        return False, f"Validation error: {e}"
+        return False, f"Validation error: {e}", None
 
 
-def validate_file(filepath: str) -> tuple[bool, str]:
-    """
-    Validate a 3TL file.
+def _read_file(path: Path) -> str:
+    """Read a 3TL file as text, memory-mapping files of at least MMAP_THRESHOLD bytes."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            content = f.read().decode('utf-8')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if hasattr(buf, 'madvise'):
+                    # Read front to back, so the kernel can read ahead and drop pages behind
+                    buf.madvise(mmap.MADV_SEQUENTIAL)
+                content = str(buf, 'utf-8')
 
-    Returns:
-        Tuple of (is_valid, error_message)
-    """
+    # Match read_text(): universal newlines, so line and column numbers are unchanged
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def _load_file(filepath: str) -> tuple[Optional[str], str]:
+    """Read a 3TL file, returning (content, error_message); content is None if it can't be read."""
     try:
         path = Path(filepath)
         if not path.exists():
-            return False, f"File not found: {filepath}"
+            return None, f"File not found: {filepath}"
 
-        content = path.read_text(encoding='utf-8')
-        return validate_string(content)
+        return _read_file(path), ""
 
     except Exception as e:
-        return False, f"Error reading file: {e}"
+        return None, f"Error reading file: {e}"
+
+
+def validate_file(filepath: str) -> tuple[bool, str]:
+    """
+    Validate a 3TL file.
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    content, error = _load_file(filepath)
+    if content is None:
+        return False, error
+    return validate_string(content)
 
 
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Validate 3TL (Typed Talking To LLMs) files using Lark parser'
     )
@@ -137,21 +260,22 @@ def main():
     if args.grammar:
         global GRAMMAR_FILE
         GRAMMAR_FILE = Path(args.grammar)
-        global _parser
-        _parser = None  # Reset cache
 
+    # Read the input once; with --show-tree, the tree is the one built while validating
     if args.string:
-        is_valid, error = validate_string(args.string)
+        content, error = args.string, ""
     else:
-        is_valid, error = validate_file(args.file)
+        content, error = _load_file(args.file)
+
+    is_valid = tree = None
+    if content is not None:
+        is_valid, error, tree = _validate(content, build_tree=args.show_tree)
 
     if is_valid:
         print("Valid 3TL format")
 
         # Show parse tree if requested
         if args.show_tree:
-            content = args.string if args.string else Path(args.file).read_text(encoding='utf-8')
-            tree = get_parser().parse(content)
             print("\nParse tree:")
             print(tree.pretty())
 